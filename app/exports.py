@@ -0,0 +1,83 @@
+# app/exports.py
+
+from app.metadata import FLAG_COLUMNS, metadata_store
+from core.futils import iter_json, iter_json_array, iter_zip
+
+
+def _jd_result(row: dict) -> dict:
+    """
+    The UI-safe ranked entry (as in analysis_result.json) of a results row.
+    """
+    entry = {
+        "resume_name": row["resume_name"],
+        "candidate_name": row["candidate_name"]
+    }
+    if row["final_score"] is not None:
+        entry["final_score"] = row["final_score"]
+    else:
+        entry["jd_score"] = row["jd_score"]
+
+    entry.update({
+        "score_source": row["score_source"],
+        "matched_skills": row["matched_skills"],
+        "missing_skills": row["missing_skills"],
+        "analysis": row["analysis"]
+    })
+    for key in ("lexical_score", "duplicate_of", "extraction"):
+        if row[key] is not None:
+            entry[key] = row[key]
+    for flag in FLAG_COLUMNS:
+        if row[flag]:
+            entry[flag] = True
+    return entry
+
+
+def _resume_files(jd_id: str):
+    for row in metadata_store.iter_results(jd_id):
+        name = row["resume_name"]
+        data = {
+            "resume_name": name,
+            "summary": {
+                "candidate_name": row["candidate_name"],
+                "overview": row["overview"] or "",
+                "skills": row["skills"]
+            },
+            "jd_result": _jd_result(row)
+        }
+        yield f"{name}_analysis.json", iter_json(data)
+
+
+def _pairwise(jd_id: str):
+    for row in metadata_store.iter_results(jd_id):
+        if row["pairwise_score"] is not None:
+            yield {"resume_name": row["resume_name"], "pairwise_score": row["pairwise_score"]}
+
+
+def _final_ranking(jd_id: str):
+    for row in metadata_store.iter_results(jd_id):
+        yield {
+            "rank": row["rank"],
+            "resume_name": row["resume_name"],
+            "candidate_name": row["candidate_name"],
+            "final_score": row["final_score"] if row["final_score"] is not None else row["jd_score"],
+            "score_source": row["score_source"]
+        }
+
+
+def _entries(jd_id: str):
+    # Same layout as create_zip
+    yield from _resume_files(jd_id)
+    yield "pairwise.json", iter_json_array(_pairwise(jd_id))
+    yield "final_ranking.json", iter_json_array(_final_ranking(jd_id))
+
+
+def iter_analysis_export(jd_id: str):
+    """
+    The stored analysis of one jd_id as a streamed ZIP (see create_zip for
+    the layout), or None if it has not been analyzed yet. Rows are read
+    from the metadata store once per file, never all at once.
+    """
+    if metadata_store.get_analysis(jd_id) is None:
+        return None
+
+    return iter_zip(_entries(jd_id))
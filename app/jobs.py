@@ -0,0 +1,220 @@
+# app/jobs.py
+
+import json
+import os
+import queue
+import socket
+import threading
+import time
+import traceback
+import uuid
+from pathlib import Path
+
+from core.fconfig import JOB_DIR, JOB_HEARTBEAT_SECONDS, JOB_STALE_SECONDS, JOB_WORKERS
+
+
+# -------------------------------------------------------------------
+# JOB STORE (ONE JSON FILE PER JOB)
+# -------------------------------------------------------------------
+
+class JobStore:
+    """
+    Job status and results live on disk so they outlive the API process.
+    """
+
+    def __init__(self, root: Path):
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+
+    def _status_path(self, job_id: str) -> Path:
+        return self.root / f"{job_id}.json"
+
+    def _result_path(self, job_id: str) -> Path:
+        return self.root / f"{job_id}.result.json"
+
+    @staticmethod
+    def _write_json(path: Path, data):
+        tmp = path.with_suffix(".tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(data, f, indent=2)
+        os.replace(tmp, path)
+
+    def get(self, job_id: str):
+        try:
+            with open(self._status_path(job_id), "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def save(self, job: dict):
+        with self._lock:
+            job["updated_at"] = time.time()
+            self._write_json(self._status_path(job["job_id"]), job)
+
+    def update(self, job_id: str, **fields):
+        with self._lock:
+            job = self.get(job_id) or {"job_id": job_id}
+            job.update(fields)
+            job["updated_at"] = time.time()
+            self._write_json(self._status_path(job_id), job)
+            return job
+
+    def save_result(self, job_id: str, result: dict):
+        self._write_json(self._result_path(job_id), result)
+
+    def get_result(self, job_id: str):
+        try:
+            with open(self._result_path(job_id), "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def claim(self, job_id: str, owner: str, stale_before: float):
+        """
+        Takes over an unfinished job whose heartbeat is older than
+        stale_before and queues it again; None if it is finished or
+        still owned by a live process.
+        """
+        with self._lock:
+            job = self.get(job_id)
+            if (
+                job is None
+                or job.get("status") not in ("queued", "running")
+                or job.get("heartbeat", job.get("updated_at", 0)) >= stale_before
+            ):
+                return None
+            now = time.time()
+            job.update(status="queued", stage="queued", owner=owner, heartbeat=now, updated_at=now)
+            self._write_json(self._status_path(job_id), job)
+            return job
+
+    def unfinished(self) -> list:
+        jobs = []
+        for path in self.root.glob("*.json"):
+            if path.name.endswith(".result.json"):
+                continue
+            job = self.get(path.stem)
+            if job and job.get("status") in ("queued", "running"):
+                jobs.append(job)
+        return sorted(jobs, key=lambda j: j.get("created_at", 0))
+
+
+# -------------------------------------------------------------------
+# WORKER QUEUE
+# -------------------------------------------------------------------
+
+class JobQueue:
+    """
+    Runs jobs on background threads.
+
+    runner(params, progress) does the work and returns the JSON result;
+    progress(stage, done, total) is persisted on the job as it runs.
+
+    Each job records its owner (host:pid) and a heartbeat the owner keeps
+    fresh. Only jobs whose heartbeat went stale - their process stopped -
+    are requeued, so processes sharing a job directory never run one job
+    twice.
+    """
+
+    def __init__(self, store: JobStore, runner, workers: int = JOB_WORKERS):
+        self.store = store
+        self.runner = runner
+        self.workers = workers
+        self.owner = f"{socket.gethostname()}:{os.getpid()}"
+        self._queue = queue.Queue()
+        self._threads = []
+        self._owned = set()
+        self._owned_lock = threading.Lock()
+
+    def start(self):
+        if self._threads:
+            return
+
+        self._adopt_stale()
+
+        for n in range(self.workers):
+            t = threading.Thread(target=self._work, name=f"job-worker-{n}", daemon=True)
+            t.start()
+            self._threads.append(t)
+
+        t = threading.Thread(target=self._heartbeat, name="job-heartbeat", daemon=True)
+        t.start()
+        self._threads.append(t)
+
+    def _adopt_stale(self):
+        # Anything queued or mid-run when its process stopped starts over
+        stale_before = time.time() - JOB_STALE_SECONDS
+        for job in self.store.unfinished():
+            if self.store.claim(job["job_id"], self.owner, stale_before) is not None:
+                self._own(job["job_id"])
+                self._queue.put(job["job_id"])
+
+    def _own(self, job_id: str):
+        with self._owned_lock:
+            self._owned.add(job_id)
+
+    def _release(self, job_id: str):
+        with self._owned_lock:
+            self._owned.discard(job_id)
+
+    def _heartbeat(self):
+        while True:
+            time.sleep(JOB_HEARTBEAT_SECONDS)
+            with self._owned_lock:
+                owned = sorted(self._owned)
+            for job_id in owned:
+                self.store.update(job_id, heartbeat=time.time())
+            self._adopt_stale()
+
+    def submit(self, params: dict) -> dict:
+        job = {
+            "job_id": str(uuid.uuid4()),
+            "status": "queued",
+            "stage": "queued",
+            "done": 0,
+            "total": 0,
+            "params": params,
+            "error": None,
+            "owner": self.owner,
+            "created_at": time.time()
+        }
+        job["heartbeat"] = job["created_at"]
+        self._own(job["job_id"])
+        self.store.save(job)
+        self._queue.put(job["job_id"])
+        return job
+
+    def _work(self):
+        while True:
+            job_id = self._queue.get()
+            try:
+                self._run(job_id)
+            finally:
+                self._release(job_id)
+                self._queue.task_done()
+
+    def _run(self, job_id: str):
+        job = self.store.get(job_id)
+        if job is None or job.get("status") != "queued" or job.get("owner") != self.owner:
+            return  # finished, or taken over by another process
+
+        self.store.update(
+            job_id, status="running", stage="starting", started_at=time.time(), heartbeat=time.time()
+        )
+
+        def progress(stage: str, done: int, total: int):
+            self.store.update(job_id, stage=stage, done=done, total=total)
+
+        try:
+            result = self.runner(job["params"], progress)
+        except Exception as e:
+            traceback.print_exc()
+            self.store.update(job_id, status="failed", stage="failed", error=str(e))
+            return
+
+        self.store.save_result(job_id, result)
+        self.store.update(job_id, status="completed", stage="completed", finished_at=time.time())
+
+
+job_store = JobStore(Path(JOB_DIR))
@@ -1,10 +1,23 @@
-from fastapi import FastAPI, UploadFile, File, HTTPException
-from typing import List
+from fastapi import FastAPI, UploadFile, File, HTTPException, Query, Request
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import JSONResponse, Response, StreamingResponse
+from pydantic import BaseModel
+from typing import List, Optional
 from pathlib import Path
-import shutil
+import json
 import uuid
 
-from app.pipeline import run_resume_analysis
+from app.exports import iter_analysis_export
+from app.jobs import JobQueue, job_store
+from app.metadata import metadata_store, migrate_upload_tree
+from app.uploads import RequestBudget, save_upload, save_uploads
+from app.pipeline import iter_resume_analysis, run_multi_jd_analysis, run_resume_analysis
+from core.fcache import get_llm_cache
+from core.fconfig import MAX_UPLOAD_REQUEST_BYTES
+from core.fjd_profile import ensure_jd_profile
+from core.fmetrics import render_metrics
+from core.fpairwise_store import get_pairwise_store
+from core.futils import LLMOutputError, ensure_llm
 
 app = FastAPI(title="Resume Analyzer API", version="1.0.0")
 
@@ -15,6 +28,23 @@ UPLOAD_ROOT = Path("uploads")
 UPLOAD_ROOT.mkdir(exist_ok=True)
 
 
+# -----------------------------
+# REJECT OVERSIZED UPLOADS EARLY
+# -----------------------------
+@app.middleware("http")
+async def limit_upload_size(request: Request, call_next):
+    # Checked before the multipart body is read; streamed bodies without
+    # a Content-Length are still capped per file/request in save_upload.
+    length = request.headers.get("content-length")
+    if request.url.path.startswith("/upload") and length and length.isdigit():
+        if int(length) > MAX_UPLOAD_REQUEST_BYTES:
+            return JSONResponse(
+                status_code=413,
+                content={"detail": "Upload exceeds the request size limit"}
+            )
+    return await call_next(request)
+
+
 # # -----------------------------
 # # ROOT CHECK
 # # -----------------------------
@@ -31,6 +61,28 @@ def health():
     return {"status": "ok"}
 
 
+# -----------------------------
+# LLM CACHE STATS
+# -----------------------------
+@app.get("/cache/stats")
+def cache_stats():
+    cache = get_llm_cache()
+    store = get_pairwise_store()
+
+    stats = {"enabled": False} if cache is None else {"enabled": True, **cache.stats()}
+    stats["pairwise_store"] = {"enabled": False} if store is None else {"enabled": True, **store.stats()}
+    return stats
+
+
+# -----------------------------
+# PROMETHEUS METRICS
+# -----------------------------
+@app.get("/metrics")
+def metrics():
+    body, content_type = render_metrics()
+    return Response(content=body, media_type=content_type)
+
+
 # =========================================================
 # 1️⃣ UPLOAD JOB DESCRIPTION
 # =========================================================
@@ -48,13 +100,23 @@ async def upload_job_description(
 
     jd_path = jd_dir / job_description.filename
 
-    with open(jd_path, "wb") as f:
-        shutil.copyfileobj(job_description.file, f)
+    saved = await save_upload(job_description, jd_path, RequestBudget())
+    await run_in_threadpool(metadata_store.add_jd, jd_id, jd_path, saved["sha256"])
+
+    # JD bullet points + skill lists are computed once here and reused
+    # by every /analyze run; if the LLM is down, analyze builds them.
+    try:
+        jd_text = jd_path.read_text(encoding="utf-8")
+        profile = await run_in_threadpool(ensure_jd_profile, ensure_llm(), jd_dir, jd_text)
+    except Exception:
+        profile = None
 
     return {
         "message": "Job description uploaded successfully",
         "jd_id": jd_id,
-        "jd_file": str(jd_path)
+        "jd_file": str(jd_path),
+        "sha256": saved["sha256"],
+        "jd_profile": profile
     }
 
 
@@ -66,65 +128,132 @@ async def upload_resumes(
     jd_id: str,
     resumes: List[UploadFile] = File(...)
 ):
-    base_dir = UPLOAD_ROOT / jd_id
-
-    if not base_dir.exists():
+    if await run_in_threadpool(metadata_store.get_jd, jd_id) is None:
         raise HTTPException(status_code=404, detail="Invalid JD ID")
 
-    resume_dir = base_dir / "resumes"
+    resume_dir = UPLOAD_ROOT / jd_id / "resumes"
     resume_dir.mkdir(exist_ok=True)
 
-    saved_files = []
-
     for resume in resumes:
         if not resume.filename.lower().endswith(".pdf"):
             raise HTTPException(status_code=400, detail="Only PDF resumes allowed")
 
-        resume_path = resume_dir / resume.filename
-        with open(resume_path, "wb") as f:
-            shutil.copyfileobj(resume.file, f)
+    # All files are kept or none: a rejected file never leaves earlier
+    # ones on disk without a metadata entry
+    saved_files = await save_uploads(resumes, resume_dir)
 
-        saved_files.append(resume.filename)
+    # Same content under another name: kept, but analyzed only once
+    duplicates = await run_in_threadpool(
+        metadata_store.add_resumes,
+        jd_id,
+        [dict(f, path=resume_dir / f["name"]) for f in saved_files]
+    )
 
     return {
         "message": "Resumes uploaded successfully",
         "jd_id": jd_id,
-        "uploaded_resumes": saved_files
+        "uploaded_resumes": [f["name"] for f in saved_files],
+        "files": [
+            dict(f, duplicate_of=duplicates[f["name"]]) if f["name"] in duplicates else f
+            for f in saved_files
+        ]
     }
 
 
 # =========================================================
-# 3️⃣ ANALYZE (CORE LOGIC RUNS HERE)
+# 3️⃣ ANALYZE (QUEUED, CORE LOGIC RUNS IN A BACKGROUND JOB)
 # =========================================================
-@app.post("/analyze/{jd_id}")
-def analyze(jd_id: str):
-    base_dir = UPLOAD_ROOT / jd_id
+def _jd_file(jd_id: str) -> Path:
+    jd = metadata_store.get_jd(jd_id)
+    if jd is None:
+        raise HTTPException(status_code=400, detail=f"Job description not found: {jd_id}")
 
-    jd_dir = base_dir / "jd"
-    resume_dir = base_dir / "resumes"
-    output_dir = base_dir / "outputs"
-
-    if not jd_dir.exists():
-        raise HTTPException(status_code=400, detail="Job description not found")
+    jd_file = Path(jd["jd_file"])
+    if not jd_file.exists():
+        raise HTTPException(status_code=400, detail="JD file missing")
+    return jd_file
 
-    if not resume_dir.exists():
-        raise HTTPException(status_code=400, detail="Resumes not uploaded")
 
-    jd_files = list(jd_dir.glob("*.txt"))
-    if not jd_files:
-        raise HTTPException(status_code=400, detail="JD file missing")
+def _analysis_inputs(jd_id: str):
+    jd_file = _jd_file(jd_id)
+    output_dir = UPLOAD_ROOT / jd_id / "outputs"
 
-    resume_files = list(resume_dir.glob("*.pdf"))
+    resume_files = metadata_store.resume_paths(jd_id)
     if not resume_files:
         raise HTTPException(status_code=400, detail="No resumes found")
 
-    jd_text = jd_files[0].read_text(encoding="utf-8")
+    return jd_file, resume_files, output_dir
+
+
+def _pipeline_args(jd_id: str) -> dict:
+    jd_file, resume_files, output_dir = _analysis_inputs(jd_id)
+
+    jd_text = jd_file.read_text(encoding="utf-8")
+    try:
+        jd_profile = ensure_jd_profile(ensure_llm(), jd_file.parent, jd_text)
+    except LLMOutputError:
+        jd_profile = {}  # not saved, so the next run asks again
+
+    return {
+        "resume_paths": resume_files,
+        "jd_text": jd_text,
+        "output_dir": output_dir,
+        "jd_profile": jd_profile
+    }
+
+
+def _jd_args(jd_id: str) -> dict:
+    jd_file = _jd_file(jd_id)
+
+    jd_text = jd_file.read_text(encoding="utf-8")
+    try:
+        jd_profile = ensure_jd_profile(ensure_llm(), jd_file.parent, jd_text)
+    except LLMOutputError:
+        jd_profile = {}
+
+    return {"jd_id": jd_id, "jd_text": jd_text, "jd_profile": jd_profile}
+
+
+def _run_batch_job(params: dict, progress):
+    batch_id = params["batch_id"]
+    _, resume_files, _ = _analysis_inputs(params["resumes_from"])
+    output_root = UPLOAD_ROOT / "batches" / batch_id
+
+    # Summaries are computed once for the pool and shared by every JD
+    result = run_multi_jd_analysis(
+        resume_files,
+        [_jd_args(jd_id) for jd_id in params["jd_ids"]],
+        output_root,
+        progress=progress
+    )
+
+    return {
+        "message": "Batch analysis completed successfully",
+        "batch_id": batch_id,
+        "output_files": {
+            "json": str(output_root / "batch_result.json"),
+            "per_jd": {
+                jd_id: str(output_root / jd_id / "analysis_result.json")
+                for jd_id in params["jd_ids"]
+            }
+        },
+        "result_summary": result
+    }
+
+
+def _run_analysis_job(params: dict, progress):
+    if "batch_id" in params:
+        return _run_batch_job(params, progress)
+
+    jd_id = params["jd_id"]
+    args = _pipeline_args(jd_id)
+    output_dir = args["output_dir"]
 
     # 🔥 CALL YOUR EXISTING PIPELINE
-    result = run_resume_analysis(
-        resume_paths=resume_files,
-        jd_text=jd_text,
-        output_dir=output_dir
+    signals = {}
+    result = run_resume_analysis(progress=progress, signals=signals, **args)
+    metadata_store.record_analysis(
+        jd_id, result, output_dir / "analysis_result.json", signals=signals
     )
 
     return {
@@ -137,6 +266,233 @@ def analyze(jd_id: str):
     }
 
 
+job_queue = JobQueue(job_store, _run_analysis_job)
+
+
+@app.on_event("startup")
+def start_job_workers():
+    if metadata_store.is_empty():
+        migrate_upload_tree(metadata_store, UPLOAD_ROOT)  # trees from before the index
+    get_pairwise_store()  # load the pairwise index before the first analysis
+    job_queue.start()
+
+
+@app.post("/analyze/{jd_id}", status_code=202)
+def analyze(jd_id: str):
+    # Fail fast on bad input instead of queueing a job that cannot run
+    _analysis_inputs(jd_id)
+
+    job = job_queue.submit({"jd_id": jd_id})
+
+    return {
+        "message": "Analysis queued",
+        "jd_id": jd_id,
+        "job_id": job["job_id"],
+        "status_url": f"/jobs/{job['job_id']}",
+        "result_url": f"/jobs/{job['job_id']}/result"
+    }
+
+
+class BatchAnalyzeRequest(BaseModel):
+    jd_ids: List[str]
+    # jd_id whose uploaded resumes form the pool; defaults to the first JD
+    resumes_from: Optional[str] = None
+
+
+@app.post("/batch/analyze", status_code=202)
+def analyze_batch(request: BatchAnalyzeRequest):
+    jd_ids = list(dict.fromkeys(request.jd_ids))
+    if not jd_ids:
+        raise HTTPException(status_code=400, detail="jd_ids must not be empty")
+
+    # Fail fast, as in /analyze
+    resumes_from = request.resumes_from or jd_ids[0]
+    _analysis_inputs(resumes_from)
+    for jd_id in jd_ids:
+        _jd_file(jd_id)
+
+    batch_id = str(uuid.uuid4())
+    job = job_queue.submit({
+        "batch_id": batch_id,
+        "jd_ids": jd_ids,
+        "resumes_from": resumes_from
+    })
+
+    return {
+        "message": "Batch analysis queued",
+        "batch_id": batch_id,
+        "jd_ids": jd_ids,
+        "job_id": job["job_id"],
+        "status_url": f"/jobs/{job['job_id']}",
+        "result_url": f"/jobs/{job['job_id']}/result"
+    }
+
+
+# =========================================================
+# 4️⃣ JOB STATUS & RESULT
+# =========================================================
+@app.get("/jobs/{job_id}")
+def job_status(job_id: str):
+    job = job_store.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+
+    return {
+        "job_id": job_id,
+        "jd_id": job.get("params", {}).get("jd_id"),
+        "batch_id": job.get("params", {}).get("batch_id"),
+        "status": job["status"],
+        # Progress within the current stage: resumes, batches, comparisons
+        # or JDs depending on the stage
+        "stage": job.get("stage"),
+        "done": job.get("done", 0),
+        "total": job.get("total", 0),
+        "error": job.get("error")
+    }
+
+
+@app.get("/jobs/{job_id}/result")
+def job_result(job_id: str):
+    job = job_store.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+
+    if job["status"] == "failed":
+        raise HTTPException(status_code=500, detail=f"Analysis failed: {job.get('error')}")
+
+    if job["status"] != "completed":
+        raise HTTPException(status_code=409, detail=f"Job is {job['status']}")
+
+    result = job_store.get_result(job_id)
+    if result is None:
+        raise HTTPException(status_code=404, detail="Job result missing")
+    return result
+
+
+# =========================================================
+# 5️⃣ STREAMING ANALYZE (RESULTS AS EACH RESUME FINISHES)
+# =========================================================
+@app.post("/analyze/{jd_id}/stream")
+def analyze_stream(jd_id: str, format: str = "ndjson"):
+    if format not in ("ndjson", "sse"):
+        raise HTTPException(status_code=400, detail="format must be ndjson or sse")
+
+    args = _pipeline_args(jd_id)
+    signals = {}
+
+    def events():
+        try:
+            for event in iter_resume_analysis(signals=signals, **args):
+                if event["event"] == "result":
+                    metadata_store.record_analysis(
+                        jd_id,
+                        event["result"],
+                        args["output_dir"] / "analysis_result.json",
+                        signals=signals
+                    )
+                if format == "sse":
+                    yield f"event: {event['event']}\ndata: {json.dumps(event)}\n\n"
+                else:
+                    yield json.dumps(event) + "\n"
+        except Exception as e:
+            # Headers are already sent; report the failure in-band
+            error = {"event": "error", "detail": f"Analysis failed: {e}"}
+            if format == "sse":
+                yield f"event: error\ndata: {json.dumps(error)}\n\n"
+            else:
+                yield json.dumps(error) + "\n"
+
+    media_type = "text/event-stream" if format == "sse" else "application/x-ndjson"
+    return StreamingResponse(events(), media_type=media_type)
+
+
+# =========================================================
+# 6️⃣ DOWNLOAD ANALYSIS ARTIFACTS (STREAMED ZIP)
+# =========================================================
+@app.get("/analyze/{jd_id}/download")
+def download_analysis(jd_id: str):
+    chunks = iter_analysis_export(jd_id)
+    if chunks is None:
+        raise HTTPException(status_code=404, detail="No analysis result for this jd_id")
+
+    # Rows are read from the metadata store and zipped while they are sent:
+    # no Content-Length, memory stays flat
+    return StreamingResponse(
+        chunks,
+        media_type="application/zip",
+        headers={"Content-Disposition": f'attachment; filename="{jd_id}_analysis.zip"'}
+    )
+
+
+# =========================================================
+# 7️⃣ JD INDEX (SERVED FROM THE METADATA STORE)
+# =========================================================
+@app.get("/jds")
+def list_jds(limit: int = 50, offset: int = 0):
+    if not 1 <= limit <= 500 or offset < 0:
+        raise HTTPException(status_code=400, detail="limit must be 1-500 and offset >= 0")
+
+    return {
+        "limit": limit,
+        "offset": offset,
+        "jds": metadata_store.list_jds(limit, offset)
+    }
+
+
+@app.get("/jds/{jd_id}")
+def get_jd(jd_id: str):
+    jd = metadata_store.get_jd(jd_id)
+    if jd is None:
+        raise HTTPException(status_code=404, detail="Invalid JD ID")
+
+    jd["analysis"] = metadata_store.get_analysis(jd_id)
+    return jd
+
+
+# =========================================================
+# 8️⃣ RESULTS QUERY (PAGINATED, FROM THE STORED RANKING)
+# =========================================================
+@app.get("/results/{jd_id}")
+def query_results(
+    jd_id: str,
+    limit: int = 50,
+    offset: int = 0,
+    min_score: Optional[float] = None,
+    max_score: Optional[float] = None,
+    matched_skill: List[str] = Query(default=[]),
+    missing_skill: List[str] = Query(default=[]),
+    score_source: Optional[str] = None
+):
+    if not 1 <= limit <= 500 or offset < 0:
+        raise HTTPException(status_code=400, detail="limit must be 1-500 and offset >= 0")
+
+    analysis = metadata_store.get_analysis(jd_id)
+    if analysis is None:
+        raise HTTPException(status_code=404, detail="No analysis result for this jd_id")
+
+    # Answered from the indexed ranking; the pipeline is not re-run
+    total, results = metadata_store.query_results(
+        jd_id,
+        limit=limit,
+        offset=offset,
+        min_score=min_score,
+        max_score=max_score,
+        matched=matched_skill,
+        missing=missing_skill,
+        score_source=score_source
+    )
+
+    return {
+        "jd_id": jd_id,
+        "analyzed": analysis["analyzed"],
+        "total": total,
+        "limit": limit,
+        "offset": offset,
+        "next_offset": offset + limit if offset + limit < total else None,
+        "results": results
+    }
+
+
 
 
 
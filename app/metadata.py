@@ -0,0 +1,472 @@
+# app/metadata.py
+
+import argparse
+import json
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+from core.fconfig import METADATA_DB_PATH
+from core.fextractor import try_file_sha256
+from core.fstate import STATE_FILE
+
+
+# -------------------------------------------------------------------
+# METADATA STORE (SQLITE, WAL)
+# -------------------------------------------------------------------
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jds (
+    jd_id TEXT PRIMARY KEY,
+    jd_file TEXT NOT NULL,
+    sha256 TEXT,
+    created REAL NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS resumes (
+    jd_id TEXT NOT NULL,
+    resume_name TEXT NOT NULL,
+    path TEXT NOT NULL,
+    sha256 TEXT,
+    bytes INTEGER,
+    uploaded REAL NOT NULL,
+    duplicate_of TEXT,
+    PRIMARY KEY (jd_id, resume_name)
+);
+
+CREATE TABLE IF NOT EXISTS analyses (
+    jd_id TEXT PRIMARY KEY,
+    result_path TEXT NOT NULL,
+    total_resumes INTEGER NOT NULL,
+    ranking_mode TEXT,
+    analyzed REAL NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS results (
+    jd_id TEXT NOT NULL,
+    resume_name TEXT NOT NULL,
+    rank INTEGER NOT NULL,
+    candidate_name TEXT,
+    score_source TEXT NOT NULL,
+    final_score NUMERIC,
+    jd_score NUMERIC,
+    pairwise_score NUMERIC,
+    lexical_score NUMERIC,
+    matched_skills TEXT NOT NULL,
+    missing_skills TEXT NOT NULL,
+    analysis TEXT,
+    duplicate_of TEXT,
+    extraction TEXT,
+    failed INTEGER,
+    pairwise_failed INTEGER,
+    overview TEXT,
+    skills TEXT,
+    PRIMARY KEY (jd_id, resume_name)
+);
+
+CREATE INDEX IF NOT EXISTS results_rank ON results(jd_id, rank);
+CREATE INDEX IF NOT EXISTS results_score ON results(jd_id, final_score);
+
+-- One row per matched/missing skill, lower-cased, for skill filters
+CREATE TABLE IF NOT EXISTS result_skills (
+    jd_id TEXT NOT NULL,
+    resume_name TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    skill TEXT NOT NULL,
+    PRIMARY KEY (jd_id, kind, skill, resume_name)
+);
+"""
+
+# Public columns of /results; jd_score, pairwise_score and the summary
+# are stored for exports only
+RESULT_COLUMNS = (
+    "rank, resume_name, candidate_name, score_source, final_score, "
+    "lexical_score, matched_skills, missing_skills, analysis, duplicate_of, "
+    "failed, pairwise_failed"
+)
+
+FLAG_COLUMNS = ("failed", "pairwise_failed")
+
+
+def _skill_key(skill) -> str:
+    return " ".join(str(skill).lower().split())
+
+
+class MetadataStore:
+    """
+    Index of uploaded JDs, their resumes (with content hashes) and the
+    latest analysis of each jd_id, so the API answers lookups and listings
+    without walking the upload tree. The files themselves stay on disk.
+    """
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self._lock = threading.Lock()
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(SCHEMA)
+        self._conn.commit()
+
+    # ----------------------------
+    # JDs & RESUMES
+    # ----------------------------
+
+    def add_jd(self, jd_id: str, jd_file: Path, sha256: str = None, created: float = None):
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO jds (jd_id, jd_file, sha256, created) VALUES (?, ?, ?, ?)",
+                (jd_id, str(jd_file), sha256, created or time.time())
+            )
+            self._conn.commit()
+
+    def add_resumes(self, jd_id: str, files: list) -> dict:
+        """
+        files: [{"path", "sha256", "bytes"}] as saved; re-uploads replace
+        the file but keep its place in upload order.
+        Returns {resume_name: original resume_name} for files whose content
+        was already uploaded for this jd_id under another name; the
+        original is the earliest upload, as in the analysis.
+        """
+        now = time.time()
+        duplicates = {}
+
+        with self._lock:
+            for f in files:
+                name, sha = Path(f["path"]).name, f.get("sha256")
+                original = None
+                if sha:
+                    row = self._conn.execute(
+                        """
+                        SELECT resume_name FROM resumes
+                        WHERE jd_id = ? AND sha256 = ? AND resume_name != ? AND duplicate_of IS NULL
+                        ORDER BY uploaded, rowid LIMIT 1
+                        """,
+                        (jd_id, sha, name)
+                    ).fetchone()
+                    original = row["resume_name"] if row else None
+                if original:
+                    duplicates[name] = original
+
+                self._conn.execute(
+                    """
+                    INSERT INTO resumes
+                        (jd_id, resume_name, path, sha256, bytes, uploaded, duplicate_of)
+                    VALUES (?, ?, ?, ?, ?, ?, ?)
+                    ON CONFLICT (jd_id, resume_name) DO UPDATE SET
+                        path = excluded.path,
+                        sha256 = excluded.sha256,
+                        bytes = excluded.bytes,
+                        duplicate_of = excluded.duplicate_of
+                    """,
+                    (jd_id, name, str(f["path"]), sha, f.get("bytes"), f.get("uploaded", now), original)
+                )
+            self._conn.commit()
+
+        return duplicates
+
+    def get_jd(self, jd_id: str):
+        """
+        {"jd_id", "jd_file", "sha256", "created", "resumes", "analyzed"} or None.
+        """
+        with self._lock:
+            row = self._conn.execute(
+                """
+                SELECT j.*,
+                       (SELECT COUNT(*) FROM resumes r WHERE r.jd_id = j.jd_id) AS resumes,
+                       a.analyzed AS analyzed
+                FROM jds j LEFT JOIN analyses a ON a.jd_id = j.jd_id
+                WHERE j.jd_id = ?
+                """,
+                (jd_id,)
+            ).fetchone()
+        return dict(row) if row else None
+
+    def list_jds(self, limit: int = 50, offset: int = 0) -> list:
+        with self._lock:
+            rows = self._conn.execute(
+                """
+                SELECT j.*,
+                       (SELECT COUNT(*) FROM resumes r WHERE r.jd_id = j.jd_id) AS resumes,
+                       a.analyzed AS analyzed
+                FROM jds j LEFT JOIN analyses a ON a.jd_id = j.jd_id
+                ORDER BY j.created DESC, j.jd_id
+                LIMIT ? OFFSET ?
+                """,
+                (limit, offset)
+            ).fetchall()
+        return [dict(r) for r in rows]
+
+    def resume_paths(self, jd_id: str) -> list:
+        """
+        Resume files of jd_id in upload order, so the analysis keeps the
+        earliest upload of repeated content as the original (see add_resumes).
+        """
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT path FROM resumes WHERE jd_id = ? ORDER BY uploaded, rowid",
+                (jd_id,)
+            ).fetchall()
+        return [Path(r["path"]) for r in rows]
+
+    # ----------------------------
+    # ANALYSES
+    # ----------------------------
+
+    def record_analysis(
+        self,
+        jd_id: str,
+        result: dict,
+        result_path: Path,
+        analyzed: float = None,
+        signals: dict = None
+    ):
+        """
+        Replaces the stored ranking of jd_id with this analysis result.
+        signals: resume_name -> internal fields the public result leaves
+        out (see iter_resume_analysis).
+        """
+        signals = signals or {}
+        rows = []
+        for rank, r in enumerate(result.get("ranked_resumes", []), start=1):
+            signal = signals.get(r["resume_name"], {})
+            rows.append((
+                jd_id,
+                r["resume_name"],
+                rank,
+                r.get("candidate_name"),
+                r.get("score_source", "llm"),
+                r.get("final_score"),
+                signal.get("jd_score", r.get("jd_score")),
+                signal.get("pairwise_score", r.get("pairwise_score")),
+                r.get("lexical_score"),
+                json.dumps(r.get("matched_skills", [])),
+                json.dumps(r.get("missing_skills", [])),
+                r.get("analysis"),
+                r.get("duplicate_of"),
+                r.get("extraction"),
+                1 if r.get("failed") else None,
+                1 if r.get("pairwise_failed") else None,
+                signal.get("overview"),
+                json.dumps(signal["skills"]) if "skills" in signal else None
+            ))
+        skills = {
+            (jd_id, r["resume_name"], kind, _skill_key(skill))
+            for r in result.get("ranked_resumes", [])
+            for kind in ("matched", "missing")
+            for skill in r.get(f"{kind}_skills", [])
+            if _skill_key(skill)
+        }
+
+        with self._lock:
+            self._conn.execute("DELETE FROM results WHERE jd_id = ?", (jd_id,))
+            self._conn.execute("DELETE FROM result_skills WHERE jd_id = ?", (jd_id,))
+            self._conn.executemany(
+                "INSERT INTO result_skills (jd_id, resume_name, kind, skill) VALUES (?, ?, ?, ?)",
+                sorted(skills)
+            )
+            self._conn.executemany(
+                """
+                INSERT OR REPLACE INTO results (
+                    jd_id, resume_name, rank, candidate_name, score_source,
+                    final_score, jd_score, pairwise_score, lexical_score,
+                    matched_skills, missing_skills, analysis, duplicate_of,
+                    extraction, failed, pairwise_failed, overview, skills
+                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                """,
+                rows
+            )
+            self._conn.execute(
+                """
+                INSERT OR REPLACE INTO analyses (jd_id, result_path, total_resumes, ranking_mode, analyzed)
+                VALUES (?, ?, ?, ?, ?)
+                """,
+                (
+                    jd_id,
+                    str(result_path),
+                    len(rows),
+                    result.get("ranking", {}).get("mode"),
+                    analyzed or time.time()
+                )
+            )
+            self._conn.commit()
+
+    def get_analysis(self, jd_id: str):
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT * FROM analyses WHERE jd_id = ?", (jd_id,)
+            ).fetchone()
+        return dict(row) if row else None
+
+    def iter_results(self, jd_id: str):
+        """
+        Every stored row of jd_id's ranking, best first, with the JSON
+        columns decoded. Read through its own connection, so a long export
+        neither holds the store lock nor loads the ranking into memory.
+        """
+        conn = sqlite3.connect(str(self.path))
+        conn.row_factory = sqlite3.Row
+        try:
+            for row in conn.execute(
+                "SELECT * FROM results WHERE jd_id = ? ORDER BY rank", (jd_id,)
+            ):
+                entry = dict(row)
+                for column in ("matched_skills", "missing_skills", "skills"):
+                    entry[column] = json.loads(entry[column]) if entry[column] else []
+                yield entry
+        finally:
+            conn.close()
+
+    def query_results(
+        self,
+        jd_id: str,
+        limit: int = 50,
+        offset: int = 0,
+        min_score: float = None,
+        max_score: float = None,
+        matched: list = (),
+        missing: list = (),
+        score_source: str = None
+    ):
+        """
+        One page of the stored ranking of jd_id, best first, as
+        (total matching rows, [result]). Every listed matched/missing
+        skill must be present (case-insensitive).
+        """
+        where, params = ["r.jd_id = ?"], [jd_id]
+
+        if min_score is not None:
+            where.append("r.final_score >= ?")
+            params.append(min_score)
+        if max_score is not None:
+            where.append("r.final_score <= ?")
+            params.append(max_score)
+        if score_source:
+            where.append("r.score_source = ?")
+            params.append(score_source)
+
+        for kind, wanted in (("matched", matched), ("missing", missing)):
+            for skill in wanted:
+                where.append(
+                    "EXISTS (SELECT 1 FROM result_skills s WHERE s.jd_id = r.jd_id "
+                    "AND s.kind = ? AND s.skill = ? AND s.resume_name = r.resume_name)"
+                )
+                params.extend((kind, _skill_key(skill)))
+
+        clause = " AND ".join(where)
+
+        with self._lock:
+            total = self._conn.execute(
+                f"SELECT COUNT(*) FROM results r WHERE {clause}", params
+            ).fetchone()[0]
+            rows = self._conn.execute(
+                f"SELECT {RESULT_COLUMNS} FROM results r WHERE {clause} ORDER BY r.rank LIMIT ? OFFSET ?",
+                params + [limit, offset]
+            ).fetchall()
+
+        results = []
+        for row in rows:
+            entry = {k: v for k, v in dict(row).items() if v is not None}
+            entry["matched_skills"] = json.loads(row["matched_skills"])
+            entry["missing_skills"] = json.loads(row["missing_skills"])
+            for flag in FLAG_COLUMNS:
+                if flag in entry:
+                    entry[flag] = True
+            results.append(entry)
+        return total, results
+
+    def is_empty(self) -> bool:
+        with self._lock:
+            return self._conn.execute("SELECT 1 FROM jds LIMIT 1").fetchone() is None
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                table: self._conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+                for table in ("jds", "resumes", "analyses", "results", "result_skills")
+            }
+
+
+# -------------------------------------------------------------------
+# MIGRATION FROM AN EXISTING UPLOAD TREE
+# -------------------------------------------------------------------
+
+def _state_signals(output_dir: Path) -> dict:
+    """
+    resume_name -> stored record from the incremental state, when there is one.
+    """
+    try:
+        with open(output_dir / STATE_FILE, "r", encoding="utf-8") as f:
+            records = json.load(f).get("resumes", {}).values()
+    except (OSError, ValueError, AttributeError):
+        return {}
+    return {r["resume_name"]: r for r in records if "resume_name" in r}
+
+
+def migrate_upload_tree(store: MetadataStore, root: Path) -> dict:
+    """
+    Indexes uploads/<jd_id>/{jd/*.txt, resumes/*.pdf, outputs/analysis_result.json}
+    written before the metadata store existed. Safe to re-run: entries are
+    replaced with what is on disk.
+    """
+    root = Path(root)
+    counts = {"jds": 0, "resumes": 0, "analyses": 0}
+
+    if not root.is_dir():
+        return counts
+
+    for base_dir in sorted(p for p in root.iterdir() if p.is_dir()):
+        jd_files = sorted((base_dir / "jd").glob("*.txt"))
+        if not jd_files:
+            continue  # not a jd_id (e.g. batch outputs)
+
+        jd_id = base_dir.name
+        jd_file = jd_files[0]
+        store.add_jd(jd_id, jd_file, try_file_sha256(jd_file), jd_file.stat().st_mtime)
+        counts["jds"] += 1
+
+        files = [
+            {
+                "path": path,
+                "sha256": try_file_sha256(path),
+                "bytes": path.stat().st_size,
+                "uploaded": path.stat().st_mtime
+            }
+            for path in sorted((base_dir / "resumes").glob("*.pdf"))
+        ]
+        store.add_resumes(jd_id, files)
+        counts["resumes"] += len(files)
+
+        result_path = base_dir / "outputs" / "analysis_result.json"
+        try:
+            with open(result_path, "r", encoding="utf-8") as f:
+                result = json.load(f)
+        except (OSError, ValueError):
+            continue
+
+        store.record_analysis(
+            jd_id,
+            result,
+            result_path,
+            result_path.stat().st_mtime,
+            _state_signals(base_dir / "outputs")
+        )
+        counts["analyses"] += 1
+
+    return counts
+
+
+metadata_store = MetadataStore(Path(METADATA_DB_PATH))
+
+
+if __name__ == "__main__":
+    # python -m app.metadata --migrate uploads
+    parser = argparse.ArgumentParser(description="Index an existing upload tree in the metadata store.")
+    parser.add_argument("--migrate", type=Path, default=Path("uploads"), help="upload root to index")
+    args = parser.parse_args()
+
+    print(json.dumps(migrate_upload_tree(metadata_store, args.migrate)))
+    print(json.dumps(metadata_store.stats()))
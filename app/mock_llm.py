@@ -0,0 +1,203 @@
+# app/mock_llm.py
+
+import hashlib
+import json
+import random
+import re
+import threading
+import time
+
+from core.fconfig import (
+    MOCK_LLM_ERROR_RATE,
+    MOCK_LLM_FAILURE_RATE,
+    MOCK_LLM_LATENCY_DIST,
+    MOCK_LLM_LATENCY_MS
+)
+
+# Skills the mock "recognises" in resumes and job descriptions
+SKILL_VOCABULARY = (
+    "python", "java", "javascript", "typescript", "go", "rust", "c++", "sql",
+    "fastapi", "django", "flask", "react", "node.js", "docker", "kubernetes",
+    "aws", "azure", "gcp", "terraform", "linux", "git", "postgresql", "mongodb",
+    "redis", "kafka", "spark", "pandas", "pytorch", "tensorflow", "machine learning",
+    "ci/cd", "graphql", "microservices", "airflow"
+)
+
+
+def _section(prompt: str, title: str, to_end: bool = False) -> str:
+    """
+    Text following "<title>:" up to the next "Heading:" line
+    (or to the end of the prompt when to_end is set).
+    """
+    end = r"\Z" if to_end else r"\n[A-Z][A-Za-z \-]+:\n|\Z"
+    match = re.search(rf"{re.escape(title)}:\n(.*?)(?:{end})", prompt, re.S)
+    return match.group(1).strip() if match else ""
+
+
+def _skills_in(text: str) -> list:
+    text = text.lower()
+    return [s for s in SKILL_VOCABULARY if re.search(rf"(?<![\w+]){re.escape(s)}(?![\w+])", text)]
+
+
+def prompt_type(prompt: str) -> str:
+    if '"results"' in prompt:
+        return "jd_batch"
+    if '"relative_score"' in prompt:
+        return "pairwise"
+    if '"candidate_name"' in prompt:
+        return "summary"
+    if '"match_score"' in prompt:
+        return "jd_score"
+    if '"points"' in prompt:
+        return "jd_profile"
+    return "unknown"
+
+
+class MockLLM:
+    """
+    Deterministic stand-in for OllamaLLM.
+
+    Every prompt type used by the pipeline gets schema-valid JSON derived
+    from the prompt itself, after a simulated latency. A prompt always gets
+    the same reply (and the same latency draw); failure_rate/error_rate make
+    a fixed share of prompts answer with non-JSON text or raise.
+    """
+
+    model = "mock-llm"
+    temperature = 0.0
+    top_p = 1.0
+    top_k = 1
+    num_predict = 512
+    format = None
+    seed = None
+
+    def __init__(
+        self,
+        latency_ms: float = MOCK_LLM_LATENCY_MS,
+        latency_dist: str = MOCK_LLM_LATENCY_DIST,
+        failure_rate: float = MOCK_LLM_FAILURE_RATE,
+        error_rate: float = MOCK_LLM_ERROR_RATE
+    ):
+        self.latency_ms = latency_ms
+        self.latency_dist = latency_dist
+        self.failure_rate = failure_rate
+        self.error_rate = error_rate
+        self._lock = threading.Lock()
+        self.reset_stats()
+
+    def reset_stats(self):
+        with self._lock:
+            self.calls = {}
+            self.prompt_chars = 0
+            self.failures = 0
+            self.errors = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "calls": dict(self.calls),
+                "total_calls": sum(self.calls.values()),
+                "prompt_chars": self.prompt_chars,
+                "malformed_replies": self.failures,
+                "errors": self.errors
+            }
+
+    def _latency(self, rng: random.Random) -> float:
+        mean = self.latency_ms / 1000
+        if mean <= 0:
+            return 0.0
+        if self.latency_dist == "constant":
+            return mean
+        if self.latency_dist == "uniform":
+            return rng.uniform(0.5 * mean, 1.5 * mean)
+        # lognormal with the requested mean and a long right tail
+        sigma = 0.5
+        return rng.lognormvariate(0, sigma) * mean / (2.718281828 ** (sigma ** 2 / 2))
+
+    def invoke(self, prompt: str, **kwargs) -> str:
+        kind = prompt_type(prompt)
+        rng = random.Random(hashlib.sha256(prompt.encode("utf-8")).digest())
+
+        time.sleep(self._latency(rng))
+        roll = rng.random()
+
+        with self._lock:
+            self.calls[kind] = self.calls.get(kind, 0) + 1
+            self.prompt_chars += len(prompt)
+
+            if roll < self.error_rate:
+                self.errors += 1
+                raise RuntimeError("mock LLM: simulated backend error")
+
+            if roll < self.error_rate + self.failure_rate:
+                self.failures += 1
+                return "Sorry, I cannot produce JSON for that."
+
+        return json.dumps(self._reply(kind, prompt, rng))
+
+    # ----------------------------
+    # Replies per prompt type
+    # ----------------------------
+
+    def _reply(self, kind: str, prompt: str, rng: random.Random) -> dict:
+        if kind == "jd_profile":
+            jd = _section(prompt, "Job Description")
+            skills = _skills_in(jd)
+            lines = [l.strip("-• ").strip() for l in jd.splitlines() if l.strip()]
+            return {
+                "points": lines[:6],
+                "required_skills": skills[: max(1, len(skills) // 2)] if skills else [],
+                "nice_to_have_skills": skills[max(1, len(skills) // 2):]
+            }
+
+        if kind == "summary":
+            resume = _section(prompt, "Resume", to_end=True)
+            first = next((l.strip() for l in resume.splitlines() if l.strip()), "")
+            skills = _skills_in(resume)
+            return {
+                "candidate_name": first[:40] if first else "Unknown",
+                "overview": f"Candidate with experience in {', '.join(skills[:5]) or 'general software work'}.",
+                "skills": skills
+            }
+
+        if kind == "jd_score":
+            return self._jd_result(
+                _section(prompt, "Resume Summary"),
+                _section(prompt, "Job Description"),
+                rng
+            )
+
+        if kind == "jd_batch":
+            jd = _section(prompt, "Job Description")
+            blocks = re.findall(r"\[(R\d+)\]\n(.*?)(?=\n\n\[R\d+\]|\Z)", prompt, re.S)
+            return {
+                "results": [
+                    dict(resume_id=rid, **self._jd_result(summary, jd, rng))
+                    for rid, summary in blocks
+                ]
+            }
+
+        if kind == "pairwise":
+            return {
+                "relative_score": rng.randint(20, 80),
+                "reason": "Simulated comparison."
+            }
+
+        return {}
+
+    @staticmethod
+    def _jd_result(summary: str, jd_text: str, rng: random.Random) -> dict:
+        wanted = _skills_in(jd_text)
+        have = set(_skills_in(summary))
+        matched = [s for s in wanted if s in have]
+        missing = [s for s in wanted if s not in have]
+
+        coverage = len(matched) / len(wanted) if wanted else 0.5
+        score = int(max(0, min(100, 100 * coverage + rng.randint(-10, 10))))
+
+        return {
+            "match_score": score,
+            "matched_skills": matched,
+            "missing_skills": missing,
+            "analysis": f"Matches {len(matched)} of {len(wanted)} JD skills."
+        }
@@ -1,106 +1,701 @@
 # app/pipeline.py
 
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from itertools import chain
 from pathlib import Path
 import json
 
-from core.fextractor import extract_resume_text
-from core.fsummarizer import summarize_resume
-from core.fcompare_jd import compare_with_jd
-from core.fpairwise_compare import compare_two_resumes
-from core.futils import ensure_llm, force_json
+from core.fconfig import (
+    DEDUP_ENABLED,
+    INCREMENTAL_ANALYSIS,
+    JD_BATCH_SIZE,
+    LLM_CONCURRENCY,
+    NEAR_DUP_THRESHOLD,
+    PAIRWISE_BUDGET,
+    PREFILTER_MIN_SCORE,
+    PREFILTER_TOP_K,
+    RANKING_MODE,
+    RANKING_TOP_K,
+    RESUME_TOKEN_BUDGET
+)
+from core.fextractor import (
+    EXTRACTOR_VERSION,
+    EXTRACT_MAX_CHARS,
+    EXTRACT_MAX_PAGES,
+    iter_extracted_texts,
+    try_file_sha256
+)
+from core.fsummarizer import SUMMARY_PROMPT_VERSION, summarize_resume
+from core.fcompare_jd import JD_PROMPT_VERSION, compare_many_with_jd, compare_with_jd
+from core.fdedup import DuplicateFinder
+from core.fpairwise_compare import comparison_hashes, compare_two_resumes
+from core.fpairwise_store import get_pairwise_store
+from core.fjd_profile import build_jd_profile
+from core.fmetrics import DUPLICATE_RESUMES, StageTimer
+from core.flexical import bm25_scores, shortlist
+from core.franking import TournamentRanker
+from core.fnormalizer import NORMALIZER_VERSION, normalize_resume_text
+from core.fstate import content_key, load_state, save_state
+from core.futils import LLMOutputError, ensure_llm
+
+
+# ----------------------------
+# CONCURRENCY HELPERS
+# ----------------------------
+
+def _iter_concurrently(fn, items, max_workers: int):
+    """
+    Yields (index, fn(item)) as each call finishes, with up to max_workers
+    calls in flight. items may be a lazy stream; work is submitted as
+    items arrive and finished results are handed back in between.
+    """
+    if max_workers <= 1:
+        for i, item in enumerate(items):
+            yield i, fn(item)
+        return
+
+    pool = ThreadPoolExecutor(max_workers=max_workers)
+    pending = {}
+
+    try:
+        for i, item in enumerate(items):
+            pending[pool.submit(fn, item)] = i
+
+            for future in [f for f in pending if f.done()]:
+                yield pending.pop(future), future.result()
+
+        for future in as_completed(list(pending)):
+            yield pending.pop(future), future.result()
+    finally:
+        # A consumer that stops early (e.g. a dropped stream) must not
+        # leave queued LLM calls running
+        pool.shutdown(wait=True, cancel_futures=True)
+
+
+def _progress_event(stage: str, done: int, total: int) -> dict:
+    return {"event": "progress", "stage": stage, "done": done, "total": total}
+
+
+def _empty_record(path: Path, analysis: str) -> dict:
+    return {
+        "resume_name": path.name,
+        "candidate_name": path.stem.replace("_", " ").title(),
+        "overview": "",
+        "jd_score": 0,
+        "matched_skills": [],
+        "missing_skills": [],
+        "analysis": analysis,
+        "score_source": "llm"
+    }
+
+
+def _lexical_record(path: Path, lexical_score: float) -> dict:
+    record = _empty_record(
+        path,
+        "Not shortlisted by the lexical pre-filter; "
+        "scored on keyword relevance to the JD only."
+    )
+    record["score_source"] = "lexical"
+    record["lexical_score"] = lexical_score
+    return record
+
+
+# Extraction outcomes that may not repeat; such records are not stored
+# for incremental reuse
+TRANSIENT_EXTRACTION = ("timeout",)
+
+# Shown instead of an analysis when extraction gave no text
+NO_TEXT_ANALYSIS = {
+    "encrypted": "The PDF is password-protected; no text could be extracted.",
+    "image_only": "The PDF has no text layer (scanned or image-only); it could not be read.",
+    "corrupt": "The PDF could not be parsed; the file may be damaged.",
+    "timeout": "Text extraction timed out for this PDF.",
+    "empty": "No readable text found in the resume.",
+}
+
+
+def _summarize_record(llm, path: Path, raw_text: str, stop_reason: str = None) -> dict:
+    """
+    Summarize one extracted resume into a record still awaiting its JD score.
+    stop_reason is why extraction stopped (see iter_pdf_pages); anything
+    other than "ok" is kept on the record as "extraction".
+    """
+    if not raw_text.strip():
+        record = _empty_record(
+            path,
+            NO_TEXT_ANALYSIS.get(stop_reason, NO_TEXT_ANALYSIS["empty"])
+        )
+        if stop_reason and stop_reason != "ok":
+            record["extraction"] = stop_reason
+        return record
+
+    # Headers/footers, whitespace and low-priority sections are trimmed
+    # before prompting; the token savings are kept on the record.
+    text, text_stats = normalize_resume_text(raw_text)
+    summary = summarize_resume(llm, text)
+
+    record = _empty_record(path, "")
+    record["candidate_name"] = summary.get(
+        "candidate_name",
+        path.stem.replace("_", " ").title()
+    )
+    record["overview"] = summary.get("overview", "")
+    record["skills"] = summary.get("skills", [])
+    record["text_stats"] = text_stats
+    if stop_reason and stop_reason != "ok":
+        record["extraction"] = stop_reason  # e.g. truncated at the page limit
+    record["needs_jd_score"] = True
+    return record
+
+
+def _apply_jd_result(record: dict, jd_result: dict) -> dict:
+    record.pop("needs_jd_score", None)
+    record["jd_score"] = jd_result.get("match_score", 0)
+    record["matched_skills"] = jd_result.get("matched_skills", [])
+    record["missing_skills"] = jd_result.get("missing_skills", [])
+    record["analysis"] = jd_result.get("analysis", "")
+    return record
+
+
+def _evaluate_resume(
+    llm,
+    path: Path,
+    raw_text: str,
+    jd_text: str,
+    jd_skills: dict = None,
+    score: bool = True,
+    summary: dict = None,
+    stop_reason: str = None
+) -> dict:
+    """
+    Summarize and (unless JD scoring is batched) JD-score one resume.
+    summary is a _summarize_record result computed earlier for the same
+    PDF (multi-JD batches), used instead of summarizing again.
+    Any failure is contained to this resume's record.
+    """
+    try:
+        if summary is not None:
+            record = dict(summary, resume_name=path.name)
+        else:
+            record = _summarize_record(llm, path, raw_text, stop_reason)
+
+        if score and record.get("needs_jd_score"):
+            _apply_jd_result(
+                record,
+                compare_with_jd(llm, record["overview"], jd_text, jd_skills)
+            )
+        return record
+    except Exception as e:
+        record = _empty_record(path, f"Resume analysis failed: {e}")
+        record["failed"] = True
+        return record
+
+
+def _score_batch(llm, records: list, jd_text: str, jd_skills: dict = None):
+    errors = {}
+    try:
+        results = compare_many_with_jd(
+            llm,
+            {i: r["overview"] for i, r in enumerate(records)},
+            jd_text,
+            jd_skills,
+            errors
+        )
+    except Exception as e:
+        results = {}
+        errors = dict.fromkeys(range(len(records)), e)
+
+    # One resume failing does not discard the rest of the batch
+    for i, record in enumerate(records):
+        if i in results:
+            _apply_jd_result(record, results[i])
+        else:
+            record.pop("needs_jd_score", None)
+            record["analysis"] = f"Resume analysis failed: {errors.get(i)}"
+            record["failed"] = True
+
+
+def _state_key(llm, jd_text: str, jd_skills: dict) -> str:
+    """
+    Stored per-resume results are only valid for the same JD, model,
+    prompts and text preparation.
+    """
+    return content_key(
+        jd_text,
+        jd_skills,
+        str(getattr(llm, "model", "")),
+        SUMMARY_PROMPT_VERSION,
+        JD_PROMPT_VERSION,
+        NORMALIZER_VERSION,
+        RESUME_TOKEN_BUDGET,
+        EXTRACTOR_VERSION,
+        EXTRACT_MAX_PAGES,
+        EXTRACT_MAX_CHARS
+    )
+
+
+def _exact_duplicates(shas: list) -> dict:
+    """
+    {i: first i with the same file hash} for repeated files.
+    """
+    first, duplicates = {}, {}
+    for i, sha in enumerate(shas):
+        if sha is None:
+            continue
+        if sha in first:
+            duplicates[i] = first[sha]
+            DUPLICATE_RESUMES.labels(kind="exact").inc()
+        else:
+            first[sha] = i
+    return duplicates
+
+
+def _jd_skills(jd_profile: dict) -> dict:
+    return {
+        "required_skills": jd_profile.get("required_skills", []),
+        "nice_to_have_skills": jd_profile.get("nice_to_have_skills", [])
+    }
+
+
+def _lexical_shortlist(texts: list, jd_text: str, jd_skills: dict, top_k: int, min_score: float):
+    """
+    (BM25 score per text, indices shortlisted for the LLM).
+    """
+    query = " ".join([jd_text, *jd_skills["required_skills"], *jd_skills["nice_to_have_skills"]])
+    lexical = bm25_scores(query, texts)
+    return lexical, shortlist(lexical, top_k, min_score)
+
+
+def _duplicate_roots(duplicates: dict) -> dict:
+    """
+    {i: original i} with every original resolved to a resume that is not
+    itself a duplicate (an exact copy of a near-duplicate points at the
+    near-duplicate's original).
+    """
+    roots = {}
+    for i, original in duplicates.items():
+        while original in duplicates:
+            original = duplicates[original]
+        roots[i] = original
+    return roots
+
+
+def _iter_unique(extracted, duplicates: dict):
+    """
+    Passes on (i, path, raw_text) items whose normalized text is not a
+    near-duplicate of an earlier item's; near-duplicates are recorded as
+    duplicates[i] = original i.
+    """
+    finder = DuplicateFinder(NEAR_DUP_THRESHOLD)
+
+    for i, path, raw_text in extracted:
+        text = normalize_resume_text(raw_text)[0] if raw_text.strip() else ""
+        found = finder.check(i, text=text)
+        if found is None:
+            yield i, path, raw_text
+            continue
+
+        duplicates[i], kind = found
+        DUPLICATE_RESUMES.labels(kind=kind).inc()
+
+
+def _duplicate_record(original: dict, path: Path) -> dict:
+    record = dict(original, resume_name=path.name, duplicate_of=original["resume_name"])
+    record.pop("text_stats", None)  # tokens were only sent once
+    return record
 
 
-def run_resume_analysis(resume_paths, jd_text: str, output_dir: Path):
+def _public_resume(r: dict) -> dict:
+    """
+    UI-safe view of an internal record; final_score once it is ranked.
+    """
+    entry = {
+        "resume_name": r["resume_name"],
+        "candidate_name": r["candidate_name"]
+    }
+    if "final_score" in r:
+        entry["final_score"] = r["final_score"]
+    else:
+        entry["jd_score"] = r["jd_score"]
+
+    entry.update({
+        "score_source": r["score_source"],
+        "matched_skills": r["matched_skills"],
+        "missing_skills": r["missing_skills"],
+        "analysis": r["analysis"]
+    })
+    if "lexical_score" in r:
+        entry["lexical_score"] = r["lexical_score"]
+    if "duplicate_of" in r:
+        entry["duplicate_of"] = r["duplicate_of"]
+    if "extraction" in r:
+        entry["extraction"] = r["extraction"]
+    for flag in ("failed", "pairwise_failed"):
+        if r.get(flag):
+            entry[flag] = True
+    return entry
+
+
+def _score_source(resume: dict) -> str:
+    """
+    "llm", "lexical" or "failed" (analysis failed or no readable text).
+    """
+    if resume.get("failed") or resume.get("extraction") in NO_TEXT_ANALYSIS:
+        return "failed"
+    return resume.get("score_source", "llm")
+
+
+# Internal record fields the public output leaves out but the metadata
+# store keeps for exports
+SIGNAL_FIELDS = ("jd_score", "pairwise_score", "overview", "skills")
+
+
+def _pairwise_score(llm, baseline_resume: dict, resume: dict):
+    """
+    None when the comparison failed (backend error or unusable reply).
+    Results are reused from the pairwise store while both resumes' prompt
+    inputs and the model are unchanged; failures are never stored.
+    """
+    if resume["resume_name"] == baseline_resume["resume_name"]:
+        return baseline_resume["jd_score"]
+
+    store = get_pairwise_store()
+    if store is not None:
+        key = (*comparison_hashes(baseline_resume, resume), str(getattr(llm, "model", "")))
+        stored = store.get(*key)
+        if stored is not None:
+            return stored["pairwise_score"]
+
+    try:
+        result = compare_two_resumes(llm, baseline_resume, resume)
+    except Exception:
+        return None
+
+    if store is not None:
+        store.put(*key, result)
+    return result["pairwise_score"]
+
+
+def _iter_tournament(llm, records: list, budget: int, top_k: int, max_workers: int):
+    """
+    Tournament ranking mode: the pairwise budget is spent in Swiss rounds
+    over the contested top of the jd_score ranking (core/franking.py)
+    instead of comparing every resume against a single baseline.
+    """
+    ranker = TournamentRanker([r["jd_score"] for r in records], budget, top_k)
+    yield _progress_event("pairwise", 0, ranker.budget)
+
+    pairs = ranker.next_round()
+    while pairs:
+        compared = _iter_concurrently(
+            lambda pair: _pairwise_score(llm, records[pair[0]], records[pair[1]]),
+            pairs,
+            max_workers
+        )
+        for k, score in compared:
+            ranker.record(*pairs[k], score)
+            yield _progress_event("pairwise", ranker.spent, ranker.budget)
+        pairs = ranker.next_round()
+
+    for record, score, rating in zip(records, ranker.pairwise_scores(), ranker.ratings()):
+        record["pairwise_score"] = score
+        record["tournament_rating"] = rating
+        yield {
+            "event": "pairwise",
+            "resume_name": record["resume_name"],
+            "pairwise_score": score
+        }
+
+    return ranker.spent
+
+
+def iter_resume_analysis(
+    resume_paths,
+    jd_text: str,
+    output_dir: Path,
+    max_workers: int = LLM_CONCURRENCY,
+    jd_batch_size: int = JD_BATCH_SIZE,
+    jd_profile: dict = None,
+    prefilter_top_k: int = PREFILTER_TOP_K,
+    prefilter_min_score: float = PREFILTER_MIN_SCORE,
+    incremental: bool = INCREMENTAL_ANALYSIS,
+    ranking_mode: str = RANKING_MODE,
+    pairwise_budget: int = PAIRWISE_BUDGET,
+    ranking_top_k: int = RANKING_TOP_K,
+    summaries: dict = None,
+    dedup: bool = DEDUP_ENABLED,
+    signals: dict = None
+):
+    """
+    The analysis pipeline as a stream of events:
+
+      {"event": "progress", "stage", "done", "total"}
+      {"event": "jd_profile", "points", "skills"}
+      {"event": "resume", "resume"}          one per resume, as JD scoring finishes
+      {"event": "pairwise", "resume_name", "pairwise_score"}
+      {"event": "result", "result"}          final ranking (also saved to output_dir)
+
+    summaries (resume sha256 -> _summarize_record result, see
+    summarize_resumes) skips extraction and summarization for those PDFs.
+    signals, if given, is filled with resume_name -> SIGNAL_FIELDS of
+    each ranked resume.
+    """
     llm = ensure_llm()
-    internal_data = []
+    summaries = summaries or {}
+    resume_paths = list(resume_paths)
+    total = len(resume_paths)
+    timer = StageTimer()
 
     # ----------------------------
     # STEP 0: JD Pointwise Summary
     # ----------------------------
-    jd_prompt = f"""
-You are a professional recruiter.
-
-Summarize the job description into concise bullet points.
-
-Return ONLY valid JSON:
-{{
-  "points": ["point 1", "point 2"]
-}}
-
-Job Description:
-{jd_text}
-"""
-    jd_points = force_json(llm.invoke(jd_prompt)).get("points", [])
+    # Normally precomputed at JD upload; only built here as a fallback
+    timer.enter("jd_points")
+    yield _progress_event("jd_points", 0, total)
+    if jd_profile is None:
+        try:
+            jd_profile = build_jd_profile(llm, jd_text)
+        except LLMOutputError:
+            jd_profile = {}  # resumes are still scored against the JD text
+
+    jd_points = jd_profile.get("points", [])
+    jd_skills = _jd_skills(jd_profile)
+    yield {"event": "jd_profile", "points": jd_points, "skills": jd_skills}
 
     # ----------------------------
     # STEP 1: Resume → JD Evaluation
     # ----------------------------
-    for path in resume_paths:
-        raw_text = extract_resume_text(path)
-
-        if not raw_text.strip():
-            internal_data.append({
-                "resume_name": path.name,
-                "candidate_name": path.stem.replace("_", " ").title(),
-                "overview": "",
-                "jd_score": 0,
-                "matched_skills": [],
-                "missing_skills": [],
-                "analysis": "No readable text found in the resume."
-            })
-            continue
-
-        summary = summarize_resume(llm, raw_text)
-
-        candidate_name = summary.get(
-            "candidate_name",
-            path.stem.replace("_", " ").title()
+    # PDFs are parsed in a process pool and each text is handed to the
+    # LLM thread pool as soon as it is ready.
+    timer.enter("evaluating")
+    yield _progress_event("evaluating", 0, total)
+    internal_data = [None] * total
+
+    # Incremental mode: results of earlier runs for this JD are keyed by
+    # each PDF's content hash; only new or changed files are processed.
+    state = load_state(output_dir, _state_key(llm, jd_text, jd_skills)) if incremental else None
+    shas = [try_file_sha256(path) for path in resume_paths]
+    reused = {}
+
+    # Re-submitted PDFs (same hash) and near-identical texts are not sent
+    # to the LLM; they get a copy of the first such resume's results.
+    duplicates = _exact_duplicates(shas) if dedup else {}
+
+    if state is not None:
+        for i, path in enumerate(resume_paths):
+            cached = state["resumes"].get(shas[i]) if shas[i] else None
+            if cached is not None and i not in duplicates:
+                reused[i] = dict(cached, resume_name=path.name)
+
+    todo = [i for i in range(total) if i not in reused and i not in duplicates]
+    # Already summarized: only the JD-dependent stages are left
+    presummarized = [i for i in todo if shas[i] in summaries]
+    stop_reasons = {}  # path -> why its extraction stopped
+
+    if prefilter_top_k or prefilter_min_score:
+        # Local BM25 pass over every text; only the shortlist reaches the LLM
+        texts = [""] * total
+        for i, _, raw_text in iter_extracted_texts(resume_paths, shas=shas, stop_reasons=stop_reasons):
+            texts[i] = raw_text
+
+        lexical, keep = _lexical_shortlist(texts, jd_text, jd_skills, prefilter_top_k, prefilter_min_score)
+
+        for i, path in enumerate(resume_paths):
+            if i in keep:
+                internal_data[i] = reused.get(i)
+            else:
+                internal_data[i] = _lexical_record(path, lexical[i])
+
+        extracted = [(i, resume_paths[i], texts[i]) for i in todo if i in keep]
+    else:
+        for i, record in reused.items():
+            internal_data[i] = record
+
+        to_extract = [i for i in todo if i not in presummarized]
+        extracted = chain(
+            ((i, resume_paths[i], "") for i in presummarized),
+            (
+                (to_extract[j], path, raw_text)
+                for j, path, raw_text in iter_extracted_texts(
+                    [resume_paths[i] for i in to_extract],
+                    shas=[shas[i] for i in to_extract],
+                    stop_reasons=stop_reasons
+                )
+            )
         )
 
-        jd_result = compare_with_jd(
-            llm,
-            summary.get("overview", ""),
-            jd_text
+    if dedup:
+        extracted = _iter_unique(extracted, duplicates)
+    for i in duplicates:
+        internal_data[i] = None  # filled in once the original is scored
+
+    score_each = jd_batch_size <= 1
+    done = 0
+
+    for record in internal_data:
+        if record is not None:  # reused or lexical-only
+            done += 1
+            yield {"event": "resume", "resume": _public_resume(record)}
+    yield _progress_event("evaluating", done, total)
+
+    def _evaluate(item):
+        i, path, raw_text = item
+        summary = summaries.get(shas[i]) if shas[i] else None
+        return i, _evaluate_resume(
+            llm, path, raw_text, jd_text, jd_skills, score_each, summary, stop_reasons.get(path)
         )
 
-        internal_data.append({
-            "resume_name": path.name,
-            "candidate_name": candidate_name,
-            "overview": summary.get("overview", ""),
-            "jd_score": jd_result.get("match_score", 0),
-            "matched_skills": jd_result.get("matched_skills", []),
-            "missing_skills": jd_result.get("missing_skills", []),
-            "analysis": jd_result.get("analysis", "")
-        })
+    for _, (i, record) in _iter_concurrently(_evaluate, extracted, max_workers):
+        internal_data[i] = record
+        done += 1
+        if not record.get("needs_jd_score"):
+            yield {"event": "resume", "resume": _public_resume(record)}
+        yield _progress_event("evaluating", done, total)
+
+    if duplicates:
+        done += len(duplicates)
+        yield _progress_event("evaluating", done, total)
+
+    if not score_each:
+        # Batched mode: K summaries per JD prompt instead of one each
+        # Duplicate slots are still empty here; they copy their original below
+        pending = [r for r in internal_data if r is not None and r.get("needs_jd_score")]
+        batches = [
+            pending[i:i + jd_batch_size]
+            for i in range(0, len(pending), jd_batch_size)
+        ]
+
+        timer.enter("jd_scoring")
+        yield _progress_event("jd_scoring", 0, len(batches))
+        scored = _iter_concurrently(
+            lambda batch: _score_batch(llm, batch, jd_text, jd_skills),
+            batches,
+            max_workers
+        )
+        for n, (b, _) in enumerate(scored, start=1):
+            for record in batches[b]:
+                yield {"event": "resume", "resume": _public_resume(record)}
+            yield _progress_event("jd_scoring", n, len(batches))
+
+    for i, original in _duplicate_roots(duplicates).items():
+        internal_data[i] = _duplicate_record(internal_data[original], resume_paths[i])
+        yield {"event": "resume", "resume": _public_resume(internal_data[i])}
+
+    for i, record in enumerate(internal_data):
+        record["sha256"] = shas[i]
+
+    if state is not None:
+        # Keep what this run can vouch for; resumes removed from the folder
+        # and lexical-only rows are not carried over.
+        kept = {}
+        for record in internal_data:
+            sha = record["sha256"]
+            if sha in kept and "duplicate_of" in record:
+                continue  # same file as its original, which is already kept
+            if (
+                sha
+                and record["score_source"] == "llm"
+                and not record.get("failed")
+                and record.get("extraction") not in TRANSIENT_EXTRACTION
+            ):
+                kept[sha] = dict(record)
+            elif sha in state["resumes"]:
+                kept[sha] = state["resumes"][sha]
+        state["resumes"] = kept
+        save_state(output_dir, state)
 
     # ----------------------------
     # STEP 2: Auto-select BASELINE
     # ----------------------------
+    timer.enter("pairwise")
+    originals = {
+        r["resume_name"] for r in internal_data
+        if r["score_source"] == "llm" and "duplicate_of" not in r
+    }
+    for record in internal_data:
+        # A reused duplicate whose original left the pool stands on its own
+        if record.get("duplicate_of") not in originals:
+            record.pop("duplicate_of", None)
+
+    # Failed analyses and unreadable PDFs have no real jd_score to compare
+    # or rank against
+    llm_scored = [
+        r for r in internal_data
+        if r["score_source"] == "llm"
+        and "duplicate_of" not in r
+        and _score_source(r) != "failed"
+    ]
+
     baseline_resume = max(
-        internal_data,
-        key=lambda x: x["jd_score"]
+        llm_scored,
+        key=lambda x: x["jd_score"],
+        default=None
     )
 
     # ----------------------------
     # STEP 3: Pairwise Comparison
     # ----------------------------
-    for resume in internal_data:
-        if resume["resume_name"] == baseline_resume["resume_name"]:
-            resume["pairwise_score"] = baseline_resume["jd_score"]
-            continue
-
-        pairwise = compare_two_resumes(
+    if ranking_mode == "tournament":
+        comparisons = yield from _iter_tournament(
             llm,
-            baseline_resume,
-            resume
+            llm_scored,
+            pairwise_budget or max(0, len(llm_scored) - 1),
+            ranking_top_k,
+            max_workers
         )
+    else:
+        yield _progress_event("pairwise", 0, len(llm_scored))
 
-        resume["pairwise_score"] = pairwise["pairwise_score"]
+        compared = _iter_concurrently(
+            lambda resume: _pairwise_score(llm, baseline_resume, resume),
+            llm_scored,
+            max_workers
+        )
+        for done, (j, score) in enumerate(compared, start=1):
+            resume = llm_scored[j]
+            if score is None:
+                resume["pairwise_failed"] = True  # ranked on jd_score alone
+            else:
+                resume["pairwise_score"] = score
+
+            yield {
+                "event": "pairwise",
+                "resume_name": resume["resume_name"],
+                "pairwise_score": score
+            }
+            yield _progress_event("pairwise", done, len(llm_scored))
+
+        comparisons = max(0, len(llm_scored) - 1)
+
+    by_name = {r["resume_name"]: r for r in llm_scored}
+    for resume in internal_data:
+        original = by_name.get(resume.get("duplicate_of"))
+        if original is not None:
+            for key in ("pairwise_score", "pairwise_failed", "tournament_rating"):
+                if key in original:
+                    resume[key] = original[key]
 
     # ----------------------------
     # STEP 4: Final Score (NO HARDCODING)
     # ----------------------------
+    timer.enter("ranking")
+    yield _progress_event("ranking", total, total)
     for resume in internal_data:
+        if resume["score_source"] == "lexical":
+            resume["final_score"] = int(resume["lexical_score"])
+            continue
+
+        # Tournament ratings already blend jd_score (as the prior) with
+        # the comparisons
+        if "tournament_rating" in resume:
+            resume["final_score"] = resume["tournament_rating"]
+            continue
+
+        # No usable comparison (failed analysis or pairwise call)
+        if "pairwise_score" not in resume:
+            resume["final_score"] = resume["jd_score"]
+            continue
+
         resume["final_score"] = int(
             0.6 * resume["jd_score"] +
             0.4 * resume["pairwise_score"]
@@ -109,36 +704,250 @@ Job Description:
     # ----------------------------
     # STEP 5: UI-safe Ranked Output
     # ----------------------------
+    # Lexical-only scores are not comparable to LLM scores, so every
+    # LLM-scored resume ranks ahead of the pre-filtered ones.
     ranked_resumes = sorted(
         internal_data,
-        key=lambda x: x["final_score"],
+        key=lambda x: (x["score_source"] == "llm", x["final_score"]),
         reverse=True
     )
 
-    public_resumes = [
-        {
-            "resume_name": r["resume_name"],
-            "candidate_name": r["candidate_name"],
-            "final_score": r["final_score"],
-            "matched_skills": r["matched_skills"],
-            "missing_skills": r["missing_skills"],
-            "analysis": r["analysis"]
-        }
-        for r in ranked_resumes
+    public_resumes = [_public_resume(r) for r in ranked_resumes]
+    if signals is not None:
+        for r in ranked_resumes:
+            signals[r["resume_name"]] = {k: r[k] for k in SIGNAL_FIELDS if k in r}
+
+    text_stats = [
+        {"resume_name": r["resume_name"], **r["text_stats"]}
+        for r in internal_data
+        if "text_stats" in r
     ]
 
     result = {
         "total_resumes": len(public_resumes),
         "job_description_points": jd_points,
-        "ranked_resumes": public_resumes
+        "job_description_skills": jd_skills,
+        "ranked_resumes": public_resumes,
+        "ranking": {"mode": ranking_mode, "pairwise_comparisons": comparisons},
+        "text_stats": {
+            "raw_tokens": sum(t["raw_tokens"] for t in text_stats),
+            "normalized_tokens": sum(t["normalized_tokens"] for t in text_stats),
+            "per_resume": text_stats
+        }
     }
 
     # ----------------------------
     # STEP 6: Save Output
     # ----------------------------
+    timer.enter("saving")
     output_dir.mkdir(parents=True, exist_ok=True)
     with open(output_dir / "analysis_result.json", "w", encoding="utf-8") as f:
         json.dump(result, f, indent=2)
+    timer.finish()
+
+    yield {"event": "result", "result": result}
+
+
+def run_resume_analysis(resume_paths, jd_text: str, output_dir: Path, progress=None, **options):
+    """
+    Runs iter_resume_analysis to completion and returns the final result.
+    progress(stage, done, total) is called as the analysis advances,
+    e.g. to update a background job's status.
+    """
+    result = None
+
+    for event in iter_resume_analysis(resume_paths, jd_text, output_dir, **options):
+        if event["event"] == "progress" and progress is not None:
+            progress(event["stage"], event["done"], event["total"])
+        elif event["event"] == "result":
+            result = event["result"]
+
+    return result
+
+
+# ----------------------------
+# MULTI-JD BATCHES
+# ----------------------------
+
+def summarize_resumes(resume_paths, max_workers: int = LLM_CONCURRENCY):
+    """
+    Extracts and summarizes each resume once, independent of any JD.
+    Yields progress events, then {"event": "summaries", "summaries"} with
+    sha256 -> _summarize_record result for iter_resume_analysis to reuse.
+    Resumes whose summary failed are left out (each JD run retries them).
+    """
+    llm = ensure_llm()
+    resume_paths = list(resume_paths)
+    shas = [try_file_sha256(path) for path in resume_paths]
+    total = len(resume_paths)
+    summaries = {}
+    stop_reasons = {}
+
+    def _summarize(item):
+        i, path, raw_text = item
+        try:
+            return i, _summarize_record(llm, path, raw_text, stop_reasons.get(path))
+        except Exception:
+            return i, None
+
+    yield _progress_event("summarizing", 0, total)
+    extracted = iter_extracted_texts(resume_paths, shas=shas, stop_reasons=stop_reasons)
+    for done, (_, (i, record)) in enumerate(
+        _iter_concurrently(_summarize, extracted, max_workers),
+        start=1
+    ):
+        if record is not None and shas[i]:
+            summaries[shas[i]] = record
+        yield _progress_event("summarizing", done, total)
+
+    yield {"event": "summaries", "summaries": summaries}
+
+
+def _batch_shortlist(resume_paths: list, jds: list, top_k: int, min_score: float) -> set:
+    """
+    Indices of resume_paths on at least one JD's lexical shortlist.
+    """
+    texts = [""] * len(resume_paths)
+    for i, _, raw_text in iter_extracted_texts(resume_paths):
+        texts[i] = raw_text
+
+    keep = set()
+    for jd in jds:
+        keep |= _lexical_shortlist(texts, jd["jd_text"], _jd_skills(jd["jd_profile"]), top_k, min_score)[1]
+    return keep
+
+
+def iter_multi_jd_analysis(resume_paths, jds: list, output_root: Path, **options):
+    """
+    One resume pool scored against several JDs. jds is a list of
+    {"jd_id", "jd_text", "jd_profile"}. Extraction and summarization run
+    once per resume; only JD scoring and the pairwise stage run per JD,
+    each JD writing its usual result to output_root / jd_id. With the
+    lexical pre-filter on, only resumes some JD shortlists are summarized.
+
+      {"event": "progress", "stage", "done", "total", ["jd_id"]}
+      {"event": "jd_result", "jd_id", "result"}
+      {"event": "result", "result"}          resumes x JDs score matrix
+
+    options are passed on to iter_resume_analysis.
+    """
+    llm = ensure_llm()
+    resume_paths = list(resume_paths)
+    output_root = Path(output_root)
+    summaries = {}
+
+    # Profiles first: the shortlists below must match the ones each JD run
+    # computes from them
+    jds = [dict(jd) for jd in jds]
+    for jd in jds:
+        if jd.get("jd_profile") is None:
+            try:
+                jd["jd_profile"] = build_jd_profile(llm, jd["jd_text"])
+            except LLMOutputError:
+                jd["jd_profile"] = {}
+
+    to_summarize = resume_paths
+    top_k = options.get("prefilter_top_k", PREFILTER_TOP_K)
+    min_score = options.get("prefilter_min_score", PREFILTER_MIN_SCORE)
+    if top_k or min_score:
+        yield _progress_event("prefilter", 0, len(jds))
+        keep = _batch_shortlist(resume_paths, jds, top_k, min_score)
+        to_summarize = [path for i, path in enumerate(resume_paths) if i in keep]
+        yield _progress_event("prefilter", len(jds), len(jds))
+
+    for event in summarize_resumes(to_summarize, options.get("max_workers", LLM_CONCURRENCY)):
+        if event["event"] == "summaries":
+            summaries = event["summaries"]
+        else:
+            yield event
+
+    # resume_name -> jd_id -> score / score source
+    final_by_resume = {path.name: {} for path in resume_paths}
+    jd_by_resume = {path.name: {} for path in resume_paths}
+    source_by_resume = {path.name: {} for path in resume_paths}
+    jd_ids = []
+
+    for n, jd in enumerate(jds):
+        jd_id = jd["jd_id"]
+        jd_ids.append(jd_id)
+        yield _progress_event("jds", n, len(jds))
+
+        for event in iter_resume_analysis(
+            resume_paths,
+            jd["jd_text"],
+            output_root / jd_id,
+            jd_profile=jd["jd_profile"],
+            summaries=summaries,
+            **options
+        ):
+            if event["event"] == "progress":
+                yield dict(event, jd_id=jd_id)
+            elif event["event"] == "resume":
+                # Ranked output only keeps final_score
+                resume = event["resume"]
+                jd_by_resume.setdefault(resume["resume_name"], {})[jd_id] = resume.get("jd_score")
+            elif event["event"] == "result":
+                for r in event["result"]["ranked_resumes"]:
+                    final_by_resume.setdefault(r["resume_name"], {})[jd_id] = r["final_score"]
+                    source_by_resume.setdefault(r["resume_name"], {})[jd_id] = _score_source(r)
+                yield {"event": "jd_result", "jd_id": jd_id, "result": event["result"]}
+
+    yield _progress_event("jds", len(jds), len(jds))
+
+    resume_names = list(final_by_resume)
+    final_scores = [
+        [final_by_resume[name].get(jd_id) for jd_id in jd_ids]
+        for name in resume_names
+    ]
+    jd_scores = [
+        [jd_by_resume.get(name, {}).get(jd_id) for jd_id in jd_ids]
+        for name in resume_names
+    ]
+
+    score_sources = [
+        [source_by_resume.get(name, {}).get(jd_id) for jd_id in jd_ids]
+        for name in resume_names
+    ]
+
+    # Lexical-only scores are not comparable to LLM scores, and failed
+    # cells carry no score at all
+    best_jd = {}
+    for name, row, sources in zip(resume_names, final_scores, score_sources):
+        scored = [
+            (score, jd_id)
+            for score, jd_id, source in zip(row, jd_ids, sources)
+            if score is not None and source == "llm"
+        ]
+        best_jd[name] = max(scored)[1] if scored else None
+
+    result = {
+        "jd_ids": jd_ids,
+        "resume_names": resume_names,
+        "final_scores": final_scores,
+        "jd_scores": jd_scores,
+        "score_sources": score_sources,
+        "best_jd": best_jd,
+        "summarized_resumes": len(summaries)
+    }
+
+    output_root.mkdir(parents=True, exist_ok=True)
+    with open(output_root / "batch_result.json", "w", encoding="utf-8") as f:
+        json.dump(result, f, indent=2)
+
+    yield {"event": "result", "result": result}
+
+
+def run_multi_jd_analysis(resume_paths, jds: list, output_root: Path, progress=None, **options):
+    """
+    Runs iter_multi_jd_analysis to completion and returns the score matrix.
+    """
+    result = None
+
+    for event in iter_multi_jd_analysis(resume_paths, jds, output_root, **options):
+        if event["event"] == "progress" and progress is not None:
+            progress(event["stage"], event["done"], event["total"])
+        elif event["event"] == "result":
+            result = event["result"]
 
     return result
 
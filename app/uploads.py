@@ -0,0 +1,105 @@
+# app/uploads.py
+
+import hashlib
+import os
+from pathlib import Path
+
+from fastapi import HTTPException, UploadFile
+from fastapi.concurrency import run_in_threadpool
+
+from core.fconfig import MAX_UPLOAD_FILE_BYTES, MAX_UPLOAD_REQUEST_BYTES, UPLOAD_CHUNK_BYTES
+
+
+class RequestBudget:
+    """
+    Tracks bytes written across all files of one upload request.
+    """
+
+    def __init__(self, max_bytes: int = MAX_UPLOAD_REQUEST_BYTES):
+        self.max_bytes = max_bytes
+        self.used = 0
+
+    def consume(self, n: int):
+        self.used += n
+        if self.used > self.max_bytes:
+            raise HTTPException(
+                status_code=413,
+                detail=f"Upload exceeds the {self.max_bytes // (1024 * 1024)} MB request limit"
+            )
+
+
+def _too_large(upload: UploadFile, max_bytes: int) -> HTTPException:
+    return HTTPException(
+        status_code=413,
+        detail=f"{upload.filename} exceeds the {max_bytes // (1024 * 1024)} MB file limit"
+    )
+
+
+async def save_upload(
+    upload: UploadFile,
+    dest: Path,
+    budget: RequestBudget,
+    max_bytes: int = MAX_UPLOAD_FILE_BYTES
+) -> dict:
+    """
+    Streams an upload to dest in chunks without blocking the event loop,
+    hashing it on the way. Oversized files are rejected as soon as they
+    cross the limit and nothing is left behind at dest.
+    """
+    declared = getattr(upload, "size", None)
+    if declared is not None and declared > max_bytes:
+        raise _too_large(upload, max_bytes)
+
+    digest = hashlib.sha256()
+    size = 0
+    part = dest.with_name(dest.name + ".part")
+    f = await run_in_threadpool(open, part, "wb")
+
+    try:
+        while True:
+            chunk = await upload.read(UPLOAD_CHUNK_BYTES)
+            if not chunk:
+                break
+
+            size += len(chunk)
+            if size > max_bytes:
+                raise _too_large(upload, max_bytes)
+            budget.consume(len(chunk))
+
+            digest.update(chunk)
+            await run_in_threadpool(f.write, chunk)
+    except BaseException:
+        await run_in_threadpool(f.close)
+        await run_in_threadpool(part.unlink, True)
+        raise
+
+    await run_in_threadpool(f.close)
+    await run_in_threadpool(os.replace, part, dest)
+
+    return {"name": dest.name, "sha256": digest.hexdigest(), "bytes": size}
+
+
+async def save_uploads(uploads, dest_dir: Path, budget: RequestBudget = None) -> list:
+    """
+    save_upload for every file of a request, all or nothing: files are
+    staged next to their destination and only moved into place once all
+    of them were accepted, so a rejected file (e.g. over a size limit)
+    leaves no partial batch behind and replaces nothing.
+    """
+    budget = budget or RequestBudget()
+    staged = []
+
+    try:
+        for i, upload in enumerate(uploads):
+            dest = dest_dir / upload.filename
+            tmp = dest_dir / f".{i}.{dest.name}.staged"
+            info = await save_upload(upload, tmp, budget)
+            staged.append((tmp, dest, dict(info, name=dest.name)))
+    except BaseException:
+        for tmp, _, _ in staged:
+            await run_in_threadpool(tmp.unlink, True)
+        raise
+
+    for tmp, dest, _ in staged:
+        await run_in_threadpool(os.replace, tmp, dest)
+    return [info for _, _, info in staged]
@@ -0,0 +1,205 @@
+# benchmarks/bench_pipeline.py
+"""
+Offline throughput benchmark for the analysis pipeline.
+
+Runs iter_resume_analysis over synthetic PDF corpora against the
+deterministic MockLLM (no Ollama needed) and reports wall time, LLM calls
+per prompt type and a per-stage breakdown.
+
+    python -m benchmarks.bench_pipeline --sizes 10 100 1000 --latency-ms 200
+    python -m benchmarks.bench_pipeline --sizes 100 --json bench.json
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+FIRST_NAMES = ("Asha", "Ben", "Chen", "Dara", "Elif", "Farah", "Gus", "Hana", "Ivan", "Jo")
+LAST_NAMES = ("Das", "Evans", "Garcia", "Ito", "Khan", "Lopez", "Mehta", "Novak", "Okafor", "Smith")
+
+JD_TEXT = """Senior Backend Engineer
+
+We are looking for a backend engineer to build and run our hiring platform.
+Required: Python, FastAPI, PostgreSQL, Docker, Kubernetes, AWS.
+Nice to have: Kafka, Redis, Terraform, CI/CD.
+You will design microservices, own deployments and mentor engineers.
+"""
+
+
+def _resume_pages(rng: random.Random, name: str, pages: int, skills: tuple) -> list:
+    picked = rng.sample(skills, rng.randint(3, 10))
+    header = f"{name} - Curriculum Vitae"
+
+    body = [
+        name,
+        f"{name.lower().replace(' ', '.')}@example.com | +1 555 {rng.randint(100, 999)} {rng.randint(1000, 9999)}",
+        "",
+        "SUMMARY",
+        f"Engineer with {rng.randint(1, 15)} years of experience.",
+        "",
+        "SKILLS",
+        ", ".join(picked),
+        "",
+        "EXPERIENCE"
+    ]
+    for job in range(rng.randint(2, 5)):
+        body.append(f"Engineer at Company {rng.randint(1, 500)} ({2010 + job}-{2012 + job})")
+        for _ in range(rng.randint(2, 6)):
+            body.append(f"- Built services with {rng.choice(picked)} and {rng.choice(picked)}.")
+    body += ["", "EDUCATION", "BSc Computer Science"]
+
+    per_page = max(1, len(body) // pages + 1)
+    chunks = [body[i:i + per_page] for i in range(0, len(body), per_page)] or [[]]
+    while len(chunks) < pages:
+        chunks.append(["REFERENCES", "Available upon request."])
+
+    return [
+        [header] + chunk + [f"Page {n} of {len(chunks)}"]
+        for n, chunk in enumerate(chunks, start=1)
+    ]
+
+
+def build_corpus(directory: Path, size: int, pages: int, seed: int = 7) -> list:
+    """
+    Writes `size` synthetic multi-page resume PDFs and returns their paths.
+    """
+    import fitz
+    from app.mock_llm import SKILL_VOCABULARY
+
+    rng = random.Random(seed)
+    directory.mkdir(parents=True, exist_ok=True)
+    paths = []
+
+    for i in range(size):
+        name = f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}"
+        path = directory / f"resume_{i:05d}.pdf"
+
+        with fitz.open() as doc:
+            for lines in _resume_pages(rng, name, pages, SKILL_VOCABULARY):
+                page = doc.new_page()
+                page.insert_text((56, 64), "\n".join(lines), fontsize=10)
+            doc.save(path)
+
+        paths.append(path)
+    return paths
+
+
+def _stage_breakdown(marks: list, end: float) -> dict:
+    """
+    marks: [(stage, first_seen_time)] in order; each stage lasts until the next.
+    """
+    breakdown = {}
+    for n, (stage, start) in enumerate(marks):
+        stop = marks[n + 1][1] if n + 1 < len(marks) else end
+        breakdown[stage] = round(stop - start, 3)
+    return breakdown
+
+
+def run_once(paths: list, output_dir: Path, concurrency: int) -> dict:
+    from app.pipeline import iter_resume_analysis
+    from core.fextractor import iter_extracted_texts
+    from core.futils import ensure_llm
+
+    llm = ensure_llm()
+    llm.reset_stats()
+
+    # PDF parsing on its own (it overlaps the LLM stages in the pipeline)
+    t0 = time.perf_counter()
+    for _ in iter_extracted_texts(paths):
+        pass
+    extraction = time.perf_counter() - t0
+
+    marks = []
+    first_result = None
+    start = time.perf_counter()
+
+    for event in iter_resume_analysis(paths, JD_TEXT, output_dir, max_workers=concurrency, incremental=False):
+        now = time.perf_counter() - start
+        if event["event"] == "progress" and (not marks or marks[-1][0] != event["stage"]):
+            marks.append((event["stage"], now))
+        elif event["event"] == "resume" and first_result is None:
+            first_result = now
+
+    wall = time.perf_counter() - start
+    stats = llm.stats()
+
+    return {
+        "resumes": len(paths),
+        "wall_seconds": round(wall, 3),
+        "resumes_per_second": round(len(paths) / wall, 2) if wall else None,
+        "time_to_first_result": round(first_result, 3) if first_result is not None else None,
+        "extraction_seconds_standalone": round(extraction, 3),
+        "stages": _stage_breakdown(marks, wall),
+        "llm_calls": stats["calls"],
+        "llm_calls_total": stats["total_calls"],
+        "prompt_chars": stats["prompt_chars"],
+        "malformed_replies": stats["malformed_replies"],
+        "llm_errors": stats["errors"]
+    }
+
+
+def _print_report(report: dict):
+    print(f"\n== {report['resumes']} resumes ==")
+    print(f"  wall time            {report['wall_seconds']:>10.3f} s  ({report['resumes_per_second']} resumes/s)")
+    print(f"  first resume result  {report['time_to_first_result'] or 0:>10.3f} s")
+    print(f"  pdf extraction only  {report['extraction_seconds_standalone']:>10.3f} s")
+    print(f"  llm calls            {report['llm_calls_total']:>10}  {report['llm_calls']}")
+    print(f"  prompt chars         {report['prompt_chars']:>10}")
+    print(f"  malformed / errors   {report['malformed_replies']:>10} / {report['llm_errors']}")
+    for stage, seconds in report["stages"].items():
+        print(f"    {stage:<18} {seconds:>10.3f} s")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 100, 1000])
+    parser.add_argument("--pages", type=int, default=2, help="pages per synthetic resume")
+    parser.add_argument("--latency-ms", type=int, default=50, help="mean simulated LLM latency")
+    parser.add_argument("--latency-dist", choices=("constant", "uniform", "lognormal"), default="lognormal")
+    parser.add_argument("--failure-pct", type=int, default=0, help="%% of replies that are not JSON")
+    parser.add_argument("--error-pct", type=int, default=0, help="%% of calls that raise")
+    parser.add_argument("--concurrency", type=int, default=None, help="LLM calls in flight (default: LLM_CONCURRENCY)")
+    parser.add_argument("--ranking-mode", choices=("baseline", "tournament"), default="baseline")
+    parser.add_argument("--pairwise-budget", type=int, default=0, help="tournament comparisons (0 = one per resume)")
+    parser.add_argument("--json", type=Path, help="also write the reports to this file")
+    args = parser.parse_args(argv)
+
+    # Must be set before app/core modules read their configuration
+    os.environ.update({
+        "USE_MOCK_LLM": "1",
+        "LLM_CACHE_ENABLED": "0",
+        "EXTRACT_CACHE_ENABLED": "0",
+        "PAIRWISE_STORE_ENABLED": "0",
+        "MOCK_LLM_LATENCY_MS": str(args.latency_ms),
+        "MOCK_LLM_LATENCY_DIST": args.latency_dist,
+        "MOCK_LLM_FAILURE_PCT": str(args.failure_pct),
+        "MOCK_LLM_ERROR_PCT": str(args.error_pct),
+        "RANKING_MODE": args.ranking_mode,
+        "PAIRWISE_BUDGET": str(args.pairwise_budget)
+    })
+    sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+    from core.fconfig import LLM_CONCURRENCY
+    concurrency = args.concurrency or LLM_CONCURRENCY
+
+    reports = []
+    with tempfile.TemporaryDirectory(prefix="resume-bench-") as tmp:
+        for size in args.sizes:
+            paths = build_corpus(Path(tmp) / f"corpus_{size}", size, args.pages)
+            report = run_once(paths, Path(tmp) / f"out_{size}", concurrency)
+            report["concurrency"] = concurrency
+            report["latency_ms"] = args.latency_ms
+            _print_report(report)
+            reports.append(report)
+
+    if args.json:
+        args.json.write_text(json.dumps(reports, indent=2), encoding="utf-8")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+# benchmarks/bench_startup.py
+"""
+Cold-start benchmark for the API process.
+
+Imports a module (app.main by default) in fresh interpreters and reports
+import time and resident memory after the import, plus the slowest
+imports from `python -X importtime`. Run before/after dependency changes
+to keep uvicorn worker start-up fast.
+
+    python -m benchmarks.bench_startup
+    python -m benchmarks.bench_startup --runs 10 --module app.pipeline --json startup.json
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+
+# Executed in the child: import the module, then report time and RSS
+PROBE = """
+import json, resource, sys, time
+t0 = time.perf_counter()
+__import__(sys.argv[1])
+elapsed = time.perf_counter() - t0
+
+rss_kb = None
+try:
+    with open("/proc/self/status") as f:
+        for line in f:
+            if line.startswith("VmRSS:"):
+                rss_kb = int(line.split()[1])
+except OSError:
+    pass
+
+peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+if sys.platform == "darwin":
+    peak //= 1024  # bytes on macOS, KiB elsewhere
+
+print(json.dumps({"import_seconds": elapsed, "rss_kb": rss_kb or peak, "peak_rss_kb": peak}))
+"""
+
+
+def _child_env() -> dict:
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [str(REPO_ROOT), env.get("PYTHONPATH")]))
+    env.pop("PYTHONPROFILEIMPORTTIME", None)
+    return env
+
+
+def measure(module: str, cwd: str) -> dict:
+    out = subprocess.run(
+        [sys.executable, "-c", PROBE, module],
+        cwd=cwd,
+        env=_child_env(),
+        capture_output=True,
+        text=True,
+        check=True
+    )
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def slowest_imports(module: str, cwd: str, top: int) -> list:
+    """
+    [(cumulative_ms, package)] of the third-party/stdlib packages that cost
+    the most (the repo's own packages include everything they import).
+    """
+    out = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=cwd,
+        env=_child_env(),
+        capture_output=True,
+        text=True,
+        check=True
+    )
+
+    costs = {}
+    for line in out.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line.split("|")
+        try:
+            us = int(cumulative.strip())
+        except ValueError:
+            continue  # header line
+        root = name.strip().split(".")[0]
+        if (REPO_ROOT / root).is_dir():
+            continue
+        costs[root] = max(costs.get(root, 0), us)
+
+    ranked = sorted(costs.items(), key=lambda kv: kv[1], reverse=True)
+    return [(round(us / 1000, 1), name) for name, us in ranked[:top]]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--module", default="app.main")
+    parser.add_argument("--runs", type=int, default=5, help="fresh interpreters to take the median over")
+    parser.add_argument("--top", type=int, default=10, help="slowest top-level imports to list")
+    parser.add_argument("--json", type=Path, help="also write the report to this file")
+    args = parser.parse_args(argv)
+
+    # app.main creates ./uploads on import; keep that out of the repo
+    with tempfile.TemporaryDirectory(prefix="resume-startup-") as cwd:
+        samples = [measure(args.module, cwd) for _ in range(max(1, args.runs))]
+        slowest = slowest_imports(args.module, cwd, args.top)
+
+    times = [s["import_seconds"] for s in samples]
+    report = {
+        "module": args.module,
+        "runs": len(samples),
+        "import_seconds_median": round(statistics.median(times), 3),
+        "import_seconds_min": round(min(times), 3),
+        "rss_mb_median": round(statistics.median(s["rss_kb"] for s in samples) / 1024, 1),
+        "slowest_imports_ms": slowest
+    }
+
+    print(f"\n== import {report['module']} ({report['runs']} runs) ==")
+    print(f"  import time (median)  {report['import_seconds_median']:>8.3f} s")
+    print(f"  import time (min)     {report['import_seconds_min']:>8.3f} s")
+    print(f"  RSS after import      {report['rss_mb_median']:>8.1f} MB")
+    print("  slowest top-level imports:")
+    for ms, name in slowest:
+        print(f"    {name:<24} {ms:>8.1f} ms")
+
+    if args.json:
+        args.json.write_text(json.dumps(report, indent=2), encoding="utf-8")
+
+
+if __name__ == "__main__":
+    main()
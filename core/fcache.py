@@ -0,0 +1,188 @@
+# core/fcache.py
+
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+from core.fconfig import LLM_CACHE_ENABLED, LLM_CACHE_MAX_ENTRIES, LLM_CACHE_PATH
+
+
+# Sampling parameters that change what the model returns for a prompt.
+CACHE_KEY_PARAMS = ("temperature", "top_p", "top_k", "num_predict", "format", "seed")
+
+
+# -------------------------------------------------------------------
+# DISK STORE (SQLITE, LRU)
+# -------------------------------------------------------------------
+
+class LLMResponseCache:
+    """
+    Persistent prompt -> response store bounded to max_entries.
+    The least recently used entries are evicted first.
+    """
+
+    def __init__(self, path: Path, max_entries: int):
+        self.path = Path(path)
+        self.max_entries = max(1, max_entries)
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY,
+                response TEXT NOT NULL,
+                last_used REAL NOT NULL
+            )
+            """
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS responses_last_used ON responses(last_used)"
+        )
+        self._conn.commit()
+        self._size = self._conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+
+    def get(self, key: str):
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT response FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+
+            if row is None:
+                self.misses += 1
+                return None
+
+            self._conn.execute(
+                "UPDATE responses SET last_used = ? WHERE key = ?",
+                (time.time(), key)
+            )
+            self._conn.commit()
+            self.hits += 1
+            return row[0]
+
+    def put(self, key: str, response: str):
+        with self._lock:
+            existed = self._conn.execute(
+                "SELECT 1 FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses (key, response, last_used) VALUES (?, ?, ?)",
+                (key, response, time.time())
+            )
+            if not existed:
+                self._size += 1
+
+            overflow = self._size - self.max_entries
+            if overflow > 0:
+                self._conn.execute(
+                    """
+                    DELETE FROM responses WHERE key IN (
+                        SELECT key FROM responses ORDER BY last_used ASC LIMIT ?
+                    )
+                    """,
+                    (overflow,)
+                )
+                self._size -= overflow
+                self.evictions += overflow
+
+            self._conn.commit()
+
+    def delete(self, key: str):
+        with self._lock:
+            deleted = self._conn.execute(
+                "DELETE FROM responses WHERE key = ?", (key,)
+            ).rowcount
+            self._conn.commit()
+            self._size -= deleted
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": self._size,
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0
+            }
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_llm_cache():
+    """
+    Process-wide cache shared by every LLM wrapper (None when disabled).
+    """
+    global _cache
+
+    if not LLM_CACHE_ENABLED:
+        return None
+
+    with _cache_lock:
+        if _cache is None:
+            _cache = LLMResponseCache(LLM_CACHE_PATH, LLM_CACHE_MAX_ENTRIES)
+        return _cache
+
+
+# -------------------------------------------------------------------
+# LLM WRAPPER
+# -------------------------------------------------------------------
+
+def cache_key(llm, prompt: str, **kwargs) -> str:
+    params = {name: getattr(llm, name, None) for name in CACHE_KEY_PARAMS}
+    params.update(kwargs)
+
+    payload = json.dumps(
+        {
+            "model": getattr(llm, "model", None),
+            "params": params,
+            "prompt": hashlib.sha256(prompt.encode("utf-8")).hexdigest()
+        },
+        sort_keys=True,
+        default=str
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class CachedLLM:
+    """
+    Drop-in wrapper around an LLM exposing the same invoke(prompt) call.
+    Identical (model, sampling params, prompt) requests are served from cache.
+    """
+
+    def __init__(self, llm, cache: LLMResponseCache):
+        self.llm = llm
+        self.cache = cache
+
+    def __getattr__(self, name):
+        return getattr(self.llm, name)
+
+    def invoke(self, prompt: str, **kwargs) -> str:
+        key = cache_key(self.llm, prompt, **kwargs)
+
+        cached = self.cache.get(key)
+        if cached is not None:
+            return cached
+
+        resp = self.llm.invoke(prompt, **kwargs)
+        self.cache.put(key, resp)
+        return resp
+
+    def evict(self, prompt: str, **kwargs):
+        """
+        Forgets the cached reply to this prompt, e.g. one the caller found
+        unusable, so the next identical request goes to the model again.
+        """
+        self.cache.delete(cache_key(self.llm, prompt, **kwargs))
@@ -1,9 +1,35 @@
 # core/fcompare_jd.py
 
-from core.futils import force_json
-from langchain_ollama import OllamaLLM
+from typing import TYPE_CHECKING
 
-def compare_with_jd(llm: OllamaLLM, resume_summary: dict, jd_text: str) -> dict:
+from core.futils import invoke_json, is_score, schema_problems
+
+if TYPE_CHECKING:  # annotation only; langchain is imported when the client is built
+    from langchain_ollama import OllamaLLM
+
+JD_SCORE_SCHEMA = {"match_score": is_score, "matched_skills": list, "missing_skills": list}
+JD_BATCH_SCHEMA = {"results": list}
+
+# Bump when either JD prompt changes so stored JD scores are not reused
+JD_PROMPT_VERSION = 1
+
+
+def _skills_block(jd_skills) -> str:
+    """
+    Precomputed JD skill lists (see core/fjd_profile.py), if available.
+    """
+    if not jd_skills:
+        return ""
+    return f"""
+Required Skills (from the JD):
+{", ".join(jd_skills.get("required_skills", [])) or "not listed"}
+
+Nice-to-have Skills (from the JD):
+{", ".join(jd_skills.get("nice_to_have_skills", [])) or "not listed"}
+"""
+
+
+def compare_with_jd(llm: "OllamaLLM", resume_summary: dict, jd_text: str, jd_skills: dict = None) -> dict:
     prompt = f"""
 You are a senior technical recruiter.
 
@@ -27,18 +53,103 @@ Resume Summary:
 
 Job Description:
 {jd_text}
-"""
-    resp = llm.invoke(prompt)
-    data = force_json(resp)
+{_skills_block(jd_skills)}"""
+    data = invoke_json(llm, prompt, "jd_score", JD_SCORE_SCHEMA)
+
+    return _jd_result(data)
+
 
+def _jd_result(data: dict) -> dict:
     return {
-        "match_score": int(data.get("match_score", 0)),
+        "match_score": int(float(data.get("match_score", 0))),
         "matched_skills": data.get("matched_skills", []),
         "missing_skills": data.get("missing_skills", []),
         "analysis": data.get("analysis", "")
     }
 
 
+def compare_many_with_jd(
+    llm: "OllamaLLM",
+    resume_summaries: dict,
+    jd_text: str,
+    jd_skills: dict = None,
+    errors: dict = None
+) -> dict:
+    """
+    Scores several resume summaries against the JD in one prompt, so the
+    JD text is sent once per batch instead of once per resume.
+
+    resume_summaries maps a caller key to its summary. Returns the same
+    keys mapped to compare_with_jd-shaped results; any resume missing or
+    malformed in the batched answer is re-scored on its own. A key whose
+    re-scoring fails is left out of the result; errors, if given, is
+    filled with key -> exception.
+    """
+    ids = {f"R{i}": key for i, key in enumerate(resume_summaries, start=1)}
+
+    resumes_block = "\n\n".join(
+        f"[{rid}]\n{resume_summaries[key]}" for rid, key in ids.items()
+    )
+
+    prompt = f"""
+You are a senior technical recruiter.
+
+Evaluate how well EACH resume below matches the job description.
+Score every resume independently of the others.
+
+Consider:
+- Skill overlap
+- Depth of experience
+- Role relevance
+
+Return ONLY JSON with one entry per resume id:
+{{
+  "results": [
+    {{
+      "resume_id": "R1",
+      "match_score": 0-100,
+      "matched_skills": [],
+      "missing_skills": [],
+      "analysis": "2-3 sentence explanation"
+    }}
+  ]
+}}
+
+Job Description:
+{jd_text}
+{_skills_block(jd_skills)}
+Resume Summaries:
+{resumes_block}
+"""
+    results = {}
+
+    try:
+        data = invoke_json(llm, prompt, "jd_batch", JD_BATCH_SCHEMA)
+        entries = data.get("results", [])
+    except Exception:
+        entries = []
+
+    for entry in entries if isinstance(entries, list) else []:
+        if not isinstance(entry, dict):
+            continue
+        key = ids.get(str(entry.get("resume_id", "")).strip())
+        if key is None or key in results or schema_problems(entry, JD_SCORE_SCHEMA):
+            continue  # unusable entry, re-scored on its own below
+        results[key] = _jd_result(entry)
+
+    # Fallback: per-resume calls for whatever the batch did not cover
+    for key, summary in resume_summaries.items():
+        if key in results:
+            continue
+        try:
+            results[key] = compare_with_jd(llm, summary, jd_text, jd_skills)
+        except Exception as e:
+            if errors is not None:
+                errors[key] = e
+
+    return results
+
+
 
 
 
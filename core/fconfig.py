@@ -0,0 +1,201 @@
+# core/fconfig.py
+
+import os
+
+
+# -------------------------------------------------------------------
+# ENV HELPERS
+# -------------------------------------------------------------------
+
+def env_int(name: str, default: int) -> int:
+    try:
+        return int(os.getenv(name, default))
+    except (TypeError, ValueError):
+        return default
+
+
+def env_bool(name: str, default: bool) -> bool:
+    value = os.getenv(name)
+    if value is None:
+        return default
+    return value.strip().lower() in ("1", "true", "yes", "on")
+
+
+# -------------------------------------------------------------------
+# PIPELINE CONCURRENCY
+# -------------------------------------------------------------------
+
+# Number of resumes whose LLM calls may be in flight at the same time.
+# 1 keeps the original strictly sequential behaviour.
+LLM_CONCURRENCY = max(1, env_int("LLM_CONCURRENCY", 4))
+
+
+# -------------------------------------------------------------------
+# LLM RESPONSE CACHE
+# -------------------------------------------------------------------
+
+LLM_CACHE_ENABLED = env_bool("LLM_CACHE_ENABLED", True)
+LLM_CACHE_PATH = os.getenv("LLM_CACHE_PATH", "cache/llm_cache.sqlite3")
+LLM_CACHE_MAX_ENTRIES = env_int("LLM_CACHE_MAX_ENTRIES", 20000)
+
+
+# -------------------------------------------------------------------
+# PAIRWISE RESULT STORE
+# -------------------------------------------------------------------
+
+# Comparisons reused across runs and jd_ids while both resumes' prompt
+# inputs and the model are unchanged
+PAIRWISE_STORE_ENABLED = env_bool("PAIRWISE_STORE_ENABLED", True)
+PAIRWISE_STORE_PATH = os.getenv("PAIRWISE_STORE_PATH", "cache/pairwise.sqlite3")
+
+
+# -------------------------------------------------------------------
+# PDF TEXT CACHE
+# -------------------------------------------------------------------
+
+EXTRACT_CACHE_ENABLED = env_bool("EXTRACT_CACHE_ENABLED", True)
+EXTRACT_CACHE_DIR = os.getenv("EXTRACT_CACHE_DIR", "cache/extracted")
+
+
+# -------------------------------------------------------------------
+# PARALLEL PDF EXTRACTION
+# -------------------------------------------------------------------
+
+# Worker processes used to parse PDFs; 1 parses inline in the caller.
+EXTRACT_WORKERS = max(1, env_int("EXTRACT_WORKERS", min(4, os.cpu_count() or 1)))
+
+# Seconds a single PDF may take before it is given up as unreadable.
+EXTRACT_TIMEOUT = max(1, env_int("EXTRACT_TIMEOUT", 60))
+
+# Pages / characters read from one PDF before it is cut off as truncated
+# (0 = no limit); keeps long portfolios out of worker memory and prompts.
+EXTRACT_MAX_PAGES = max(0, env_int("EXTRACT_MAX_PAGES", 20))
+EXTRACT_MAX_CHARS = max(0, env_int("EXTRACT_MAX_CHARS", 60000))
+
+
+# -------------------------------------------------------------------
+# BACKGROUND ANALYSIS JOBS
+# -------------------------------------------------------------------
+
+JOB_DIR = os.getenv("JOB_DIR", "jobs")
+
+# Analyses run at the same time in one API process.
+JOB_WORKERS = max(1, env_int("JOB_WORKERS", 2))
+
+# Several API processes may share JOB_DIR: each refreshes the heartbeat of
+# the jobs it owns, and only jobs whose heartbeat is older than
+# JOB_STALE_SECONDS (their process died) are taken over by another one.
+JOB_HEARTBEAT_SECONDS = max(1, env_int("JOB_HEARTBEAT_SECONDS", 10))
+JOB_STALE_SECONDS = max(2 * JOB_HEARTBEAT_SECONDS, env_int("JOB_STALE_SECONDS", 60))
+
+
+# -------------------------------------------------------------------
+# METADATA STORE
+# -------------------------------------------------------------------
+
+# SQLite index of jd_ids, resume files and analysis results; built from
+# the upload tree on first start
+METADATA_DB_PATH = os.getenv("METADATA_DB_PATH", "uploads/metadata.sqlite3")
+
+
+# -------------------------------------------------------------------
+# UPLOAD LIMITS
+# -------------------------------------------------------------------
+
+MAX_UPLOAD_FILE_BYTES = env_int("MAX_UPLOAD_FILE_MB", 20) * 1024 * 1024
+MAX_UPLOAD_REQUEST_BYTES = env_int("MAX_UPLOAD_REQUEST_MB", 200) * 1024 * 1024
+UPLOAD_CHUNK_BYTES = max(4096, env_int("UPLOAD_CHUNK_KB", 1024) * 1024)
+
+
+# -------------------------------------------------------------------
+# BATCHED JD SCORING
+# -------------------------------------------------------------------
+
+# Resume summaries scored against the JD per LLM call; 1 scores each
+# resume in its own prompt.
+JD_BATCH_SIZE = max(1, env_int("JD_BATCH_SIZE", 1))
+
+
+# -------------------------------------------------------------------
+# LEXICAL PRE-FILTER
+# -------------------------------------------------------------------
+
+# Only the PREFILTER_TOP_K best BM25 matches (0 = no cap) scoring at least
+# PREFILTER_MIN_SCORE (0-100, relative to the best resume) go to the LLM.
+# Both 0 disables the pre-filter.
+PREFILTER_TOP_K = max(0, env_int("PREFILTER_TOP_K", 0))
+PREFILTER_MIN_SCORE = max(0, env_int("PREFILTER_MIN_SCORE", 0))
+
+
+# -------------------------------------------------------------------
+# PAIRWISE RANKING
+# -------------------------------------------------------------------
+
+# baseline:   every resume compared once against the top jd_score resume
+# tournament: Swiss rounds over the contested top RANKING_TOP_K, aggregated
+#             with a Bradley-Terry model (see core/franking.py)
+RANKING_MODE = os.getenv("RANKING_MODE", "baseline").strip().lower()
+RANKING_TOP_K = max(1, env_int("RANKING_TOP_K", 10))
+
+# Comparisons per analysis in tournament mode; 0 = one per resume, the
+# same number of calls as baseline mode
+PAIRWISE_BUDGET = max(0, env_int("PAIRWISE_BUDGET", 0))
+
+
+# -------------------------------------------------------------------
+# INCREMENTAL ANALYSIS
+# -------------------------------------------------------------------
+
+# Reuse per-resume results from earlier runs of the same jd_id
+INCREMENTAL_ANALYSIS = env_bool("INCREMENTAL_ANALYSIS", True)
+
+
+# -------------------------------------------------------------------
+# DUPLICATE RESUMES
+# -------------------------------------------------------------------
+
+# Identical PDFs and near-identical texts (estimated word 5-gram Jaccard
+# similarity of at least NEAR_DUP_THRESHOLD percent) share one set of LLM
+# results per analysis.
+DEDUP_ENABLED = env_bool("DEDUP_ENABLED", True)
+NEAR_DUP_THRESHOLD = min(100, max(1, env_int("NEAR_DUP_THRESHOLD", 90))) / 100
+
+
+# -------------------------------------------------------------------
+# LLM BACKEND
+# -------------------------------------------------------------------
+
+OLLAMA_BASE_URL = os.getenv("OLLAMA_BASE_URL", "http://192.168.11.97:11434")
+OLLAMA_MODEL = os.getenv("OLLAMA_MODEL", "llama3.1:8b")
+OLLAMA_KEEP_ALIVE = os.getenv("OLLAMA_KEEP_ALIVE", "30m")  # how long the server keeps the model loaded
+LLM_NUM_PREDICT = env_int("LLM_NUM_PREDICT", 512)
+
+# Requests in flight to the backend across every concurrent analysis
+LLM_MAX_INFLIGHT = max(1, env_int("LLM_MAX_INFLIGHT", 8))
+
+# Pooled keep-alive HTTP connections and per-request timeout (seconds)
+LLM_HTTP_MAX_CONNECTIONS = max(1, env_int("LLM_HTTP_MAX_CONNECTIONS", LLM_MAX_INFLIGHT))
+LLM_HTTP_TIMEOUT = max(1, env_int("LLM_HTTP_TIMEOUT", 300))
+
+# Ask Ollama for JSON-constrained output (format="json"); every prompt
+# expects a single JSON object back
+LLM_JSON_MODE = env_bool("LLM_JSON_MODE", True)
+
+
+# -------------------------------------------------------------------
+# RESUME TEXT NORMALIZATION
+# -------------------------------------------------------------------
+
+# Approximate token cap for resume text sent to the summarizer; 0 = no cap
+RESUME_TOKEN_BUDGET = max(0, env_int("RESUME_TOKEN_BUDGET", 1500))
+
+
+# -------------------------------------------------------------------
+# MOCK LLM (OFFLINE TESTING / BENCHMARKS)
+# -------------------------------------------------------------------
+
+USE_MOCK_LLM = env_bool("USE_MOCK_LLM", False)
+MOCK_LLM_LATENCY_DIST = os.getenv("MOCK_LLM_LATENCY_DIST", "lognormal")  # constant | uniform | lognormal
+MOCK_LLM_LATENCY_MS = max(0, env_int("MOCK_LLM_LATENCY_MS", 0))
+MOCK_LLM_FAILURE_RATE = env_int("MOCK_LLM_FAILURE_PCT", 0) / 100  # malformed (non-JSON) replies
+MOCK_LLM_ERROR_RATE = env_int("MOCK_LLM_ERROR_PCT", 0) / 100  # raised exceptions
@@ -0,0 +1,122 @@
+# core/fdedup.py
+
+import hashlib
+
+from core.flexical import tokenize
+
+SHINGLE_WORDS = 5
+
+# 32 bands of 4 rows: pairs above ~0.5 Jaccard almost always share a band;
+# candidates are then checked against the real threshold.
+NUM_PERM = 128
+BANDS = 32
+
+_SEED = 1729
+_params = None
+
+
+def _hash_params():
+    # Multiply-shift hash family over 64-bit shingle hashes; fixed seed so
+    # signatures are comparable across runs and processes
+    global _params
+    if _params is None:
+        import numpy as np
+
+        rng = np.random.default_rng(_SEED)
+        a = rng.integers(1, 2 ** 63, size=NUM_PERM, dtype=np.uint64) * np.uint64(2) + np.uint64(1)
+        b = rng.integers(0, 2 ** 63, size=NUM_PERM, dtype=np.uint64)
+        _params = (a, b)
+    return _params
+
+
+def shingles(text: str, k: int = SHINGLE_WORDS) -> set:
+    """
+    64-bit hashes of the text's overlapping k-word shingles.
+    """
+    tokens = tokenize(text or "")
+    if not tokens:
+        return set()
+
+    grams = (
+        " ".join(tokens[i:i + k])
+        for i in range(max(1, len(tokens) - k + 1))
+    )
+    return {
+        int.from_bytes(hashlib.blake2b(g.encode("utf-8"), digest_size=8).digest(), "little")
+        for g in grams
+    }
+
+
+def minhash(text: str):
+    """
+    NUM_PERM-value MinHash signature of the text, or None if it has no words.
+    """
+    import numpy as np
+
+    hashed = shingles(text)
+    if not hashed:
+        return None
+
+    a, b = _hash_params()
+    x = np.fromiter(hashed, dtype=np.uint64, count=len(hashed))
+    with np.errstate(over="ignore"):
+        values = (a[:, None] * x[None, :] + b[:, None]) >> np.uint64(32)
+    return values.min(axis=1)
+
+
+def similarity(sig_a, sig_b) -> float:
+    """
+    Estimated Jaccard similarity of the two texts' shingle sets.
+    """
+    return float((sig_a == sig_b).mean())
+
+
+class DuplicateFinder:
+    """
+    Maps each resume to the first one seen with the same content: identical
+    file hash (exact) or a MinHash/LSH match at or above threshold (near).
+
+        finder = DuplicateFinder(0.9)
+        original = finder.check(key, sha256, normalized_text)  # None if new
+    """
+
+    def __init__(self, threshold: float):
+        self.threshold = threshold
+        self.rows = NUM_PERM // BANDS
+        self._by_sha = {}
+        self._signatures = {}
+        self._buckets = {}
+
+    def check(self, key, sha: str = None, text: str = ""):
+        """
+        (original key, "exact" | "near") if key duplicates an earlier
+        resume, else None (key is then registered as an original).
+        """
+        if sha and sha in self._by_sha:
+            return self._by_sha[sha], "exact"
+
+        signature = minhash(text) if text else None
+        if signature is not None:
+            bands = [
+                (band, signature[band * self.rows:(band + 1) * self.rows].tobytes())
+                for band in range(BANDS)
+            ]
+            candidates = {c for band in bands for c in self._buckets.get(band, ())}
+
+            best, best_sim = None, 0.0
+            for candidate in sorted(candidates):
+                sim = similarity(signature, self._signatures[candidate])
+                if sim >= self.threshold and sim > best_sim:
+                    best, best_sim = candidate, sim
+            if best is not None:
+                if sha:
+                    self._by_sha[sha] = best
+                return best, "near"
+
+            self._signatures[key] = signature
+            for band in bands:
+                self._buckets.setdefault(band, []).append(key)
+
+        if sha:
+            self._by_sha[sha] = key
+        return None
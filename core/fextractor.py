@@ -1,14 +1,311 @@
 #PyMuPDF (fitz) to open the PDF, For each page extracting plain text.
 
 import fitz  # PyMuPDF - pdf parser
+import hashlib
+import json
+import multiprocessing
+import os
+import queue
+import time
 from pathlib import Path
 
+from core.fconfig import (
+    EXTRACT_CACHE_DIR,
+    EXTRACT_CACHE_ENABLED,
+    EXTRACT_MAX_CHARS,
+    EXTRACT_MAX_PAGES,
+    EXTRACT_TIMEOUT,
+    EXTRACT_WORKERS
+)
+from core.fmetrics import EXTRACTION_CACHE_HITS, EXTRACTION_SECONDS
+
+# Bump whenever extract_resume_text changes what it returns,
+# so texts cached by an older version are re-extracted.
+EXTRACTOR_VERSION = 3
+
+# Why extraction stopped: "ok" (every page read), "truncated" (page or
+# character limit hit), "encrypted", "image_only" (pages but no text
+# layer), "empty" (no text, no images), "corrupt" (unparseable) or,
+# from iter_extracted_texts only, "timeout".
+STOP_OK = "ok"
+
+
+def _no_text_reason(has_images: bool) -> str:
+    return "image_only" if has_images else "empty"
+
+
+def iter_pdf_pages(pdf_path: Path, max_pages: int = EXTRACT_MAX_PAGES, max_chars: int = EXTRACT_MAX_CHARS):
+    """
+    Yields the text of each page in order, loading one page at a time, and
+    returns the stop reason (0 disables a limit):
+
+        reason = yield from iter_pdf_pages(path)
+
+    The page that crosses the character limit is cut to fit, so no PDF
+    yields more than max_chars characters of page text.
+    """
+    try:
+        doc = fitz.open(pdf_path)
+    except Exception:
+        return "corrupt"
+
+    with doc:
+        if doc.needs_pass and not doc.authenticate(""):
+            return "encrypted"
+
+        chars = 0
+        has_text = has_images = False
+
+        try:
+            for n in range(doc.page_count):
+                if max_pages and n >= max_pages:
+                    return "truncated" if has_text else _no_text_reason(has_images)
+
+                page = doc.load_page(n)
+                text = page.get_text("text")
+                if text.strip():
+                    has_text = True
+                elif not has_images and page.get_images():
+                    has_images = True
+                del page
+
+                if max_chars and chars + len(text) > max_chars:
+                    yield text[:max_chars - chars]
+                    return "truncated"
+
+                chars += len(text)
+                yield text
+        except Exception:
+            return "corrupt"
+
+    return STOP_OK if has_text else _no_text_reason(has_images)
+
+
+def extract_pdf_text(pdf_path: Path, max_pages: int = EXTRACT_MAX_PAGES, max_chars: int = EXTRACT_MAX_CHARS):
+    """
+    (text, stop_reason) of one PDF; form feeds mark page breaks.
+    """
+    pages = iter_pdf_pages(pdf_path, max_pages, max_chars)
+    text = []
+    while True:
+        try:
+            text.append(next(pages))
+        except StopIteration as stop:
+            return "\f".join(text), stop.value
+
+
 def extract_resume_text(pdf_path: Path) -> str:  #takes the path to a resume pdf and returns a single string containing all texts
+    return extract_pdf_text(pdf_path)[0]
+
+
+# -------------------------------------------------------------------
+# CONTENT-ADDRESSED TEXT CACHE
+# -------------------------------------------------------------------
+
+def file_sha256(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _cache_path(sha: str) -> Path:
+    return Path(EXTRACT_CACHE_DIR) / sha[:2] / f"{sha}.json"
+
+
+def load_cached_text(sha: str):
+    """
+    Returns (text, stop_reason) cached for this PDF hash, or None when
+    missing/stale. Entries written under other page/char limits are
+    stale: their text was cut at a different point.
+    """
+    try:
+        with open(_cache_path(sha), "r", encoding="utf-8") as f:
+            entry = json.load(f)
+    except (OSError, ValueError):
+        return None
+
+    if (
+        entry.get("version") != EXTRACTOR_VERSION
+        or entry.get("max_pages") != EXTRACT_MAX_PAGES
+        or entry.get("max_chars") != EXTRACT_MAX_CHARS
+        or "text" not in entry
+    ):
+        return None
+    return entry["text"], entry.get("stop_reason", STOP_OK)
+
+
+def store_cached_text(sha: str, text: str, stop_reason: str = STOP_OK):
+    path = _cache_path(sha)
+    path.parent.mkdir(parents=True, exist_ok=True)
+
+    tmp = path.with_suffix(f".{os.getpid()}.tmp")
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(
+            {
+                "version": EXTRACTOR_VERSION,
+                "max_pages": EXTRACT_MAX_PAGES,
+                "max_chars": EXTRACT_MAX_CHARS,
+                "text": text,
+                "stop_reason": stop_reason
+            },
+            f
+        )
+    os.replace(tmp, path)  # atomic, so readers never see a half-written entry
+
+
+# -------------------------------------------------------------------
+# PARALLEL EXTRACTION (PROCESS POOL)
+# -------------------------------------------------------------------
+
+def _extract_in_worker(pdf_path: str):
+    """
+    (text, seconds, stop_reason). Timed here but recorded by the parent:
+    metrics updated in a pool process never reach the API process.
+    """
+    started = time.perf_counter()
     try:
-        text = []
-        with fitz.open(pdf_path) as doc:
-            for page in doc: #loops through all pages and extracts text
-                text.append(page.get_text("text"))
-        return "\n".join(text) # Combine text from all pages to a big string
+        text, reason = extract_pdf_text(Path(pdf_path))
     except Exception:
-        return ""
+        text, reason = "", "corrupt"
+    return text, time.perf_counter() - started, reason
+
+
+def try_file_sha256(path: Path):
+    try:
+        return file_sha256(path)
+    except OSError:
+        return None
+
+
+def iter_extracted_texts(
+    pdf_paths,
+    workers: int = EXTRACT_WORKERS,
+    timeout: float = EXTRACT_TIMEOUT,
+    shas: list = None,
+    stop_reasons: dict = None
+):
+    """
+    Yields (index, path, text) for every PDF as soon as its text is ready.
+    shas may carry already-computed SHA-256s of pdf_paths to skip rehashing.
+    stop_reasons, if given, is filled with path -> stop reason (see
+    iter_pdf_pages) before each text is yielded.
+
+    Cached texts come back first; the rest are parsed in a process pool with
+    at most `workers` files in flight. A file that takes longer than `timeout`
+    seconds is yielded with empty text and its worker is abandoned.
+    With workers <= 1 files are parsed inline, without a timeout.
+    """
+    pending = []
+    if stop_reasons is None:
+        stop_reasons = {}
+
+    for i, path in enumerate(pdf_paths):
+        if not EXTRACT_CACHE_ENABLED:
+            sha = None
+        elif shas is not None:
+            sha = shas[i]
+        else:
+            sha = try_file_sha256(path)
+        cached = load_cached_text(sha) if sha else None
+
+        if cached is not None:
+            EXTRACTION_CACHE_HITS.inc()
+            text, stop_reasons[path] = cached
+            yield i, path, text
+        else:
+            pending.append((i, path, sha))
+
+    if not pending:
+        return
+
+    # Inline parsing has no timeout, so even a single file goes to the pool
+    # unless the pool is disabled
+    if workers <= 1:
+        for i, path, sha in pending:
+            started = time.perf_counter()
+            text, reason = extract_pdf_text(path)
+            EXTRACTION_SECONDS.labels(outcome=reason).observe(time.perf_counter() - started)
+            if sha:
+                store_cached_text(sha, text, reason)
+            stop_reasons[path] = reason
+            yield i, path, text
+        return
+
+    # spawn: the API process runs threads, which fork does not copy safely
+    ctx = multiprocessing.get_context("spawn")
+    size = min(workers, len(pending))
+    results = queue.Queue()
+    todo = iter(pending)
+    in_flight = {}
+
+    pool = ctx.Pool(processes=size)
+    capacity = size
+
+    def submit(i, path, sha):
+        in_flight[i] = (path, sha, time.monotonic() + timeout)
+        pool.apply_async(
+            _extract_in_worker,
+            (str(path),),
+            callback=lambda out, i=i: results.put((i, *out)),
+            error_callback=lambda _e, i=i: results.put((i, "", None, "corrupt"))
+        )
+
+    def submit_next() -> bool:
+        item = next(todo, None)
+        if item is None:
+            return False
+        submit(*item)
+        return True
+
+    try:
+        for _ in range(capacity):
+            submit_next()
+
+        while in_flight:
+            deadline = min(d for _, _, d in in_flight.values())
+
+            try:
+                i, text, seconds, reason = results.get(timeout=max(0.0, deadline - time.monotonic()))
+            except queue.Empty:
+                now = time.monotonic()
+                expired = [i for i, (_, _, d) in in_flight.items() if d <= now]
+
+                for i in expired:
+                    path, _, _ = in_flight.pop(i)
+                    EXTRACTION_SECONDS.labels(outcome="timeout").observe(timeout)
+                    capacity -= 1  # that worker is stuck until the pool is torn down
+                    stop_reasons[path] = "timeout"
+                    yield i, path, ""
+
+                if capacity <= 0:
+                    # Every worker is hung: replace the pool and resubmit
+                    # whatever was still queued behind them
+                    pool.terminate()
+                    pool.join()
+                    pool = ctx.Pool(processes=size)
+                    capacity = size
+                    for i, (path, sha, _) in list(in_flight.items()):
+                        submit(i, path, sha)
+
+                while len(in_flight) < capacity and submit_next():
+                    pass
+                continue
+
+            if i not in in_flight:
+                continue  # late result for a file that already timed out
+
+            path, sha, _ = in_flight.pop(i)
+            if seconds is not None:
+                EXTRACTION_SECONDS.labels(outcome=reason).observe(seconds)
+            if sha:
+                store_cached_text(sha, text, reason)
+            stop_reasons[path] = reason
+            yield i, path, text
+
+            if len(in_flight) < capacity:
+                submit_next()
+    finally:
+        pool.terminate()
+        pool.join()
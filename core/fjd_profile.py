@@ -0,0 +1,86 @@
+# core/fjd_profile.py
+
+import hashlib
+import json
+import os
+from pathlib import Path
+
+from core.futils import invoke_json
+
+JD_PROFILE_FILE = "jd_profile.json"
+
+JD_PROFILE_SCHEMA = {"points": list, "required_skills": list, "nice_to_have_skills": list}
+
+
+def build_jd_profile(llm, jd_text: str) -> dict:
+    """
+    One LLM pass over the JD: bullet points for the UI plus the
+    structured skill lists used by the scoring stages.
+    """
+    prompt = f"""
+You are a professional recruiter.
+
+Summarize the job description into concise bullet points and list
+the skills it asks for.
+
+Rules:
+- required_skills: skills the JD states as mandatory
+- nice_to_have_skills: skills mentioned as preferred, a plus or optional
+- Return ONLY valid JSON
+
+Return ONLY valid JSON:
+{{
+  "points": ["point 1", "point 2"],
+  "required_skills": ["skill1", "skill2"],
+  "nice_to_have_skills": ["skill3"]
+}}
+
+Job Description:
+{jd_text}
+"""
+    data = invoke_json(llm, prompt, "jd_profile", JD_PROFILE_SCHEMA)
+
+    return {
+        "points": data.get("points", []),
+        "required_skills": data.get("required_skills", []),
+        "nice_to_have_skills": data.get("nice_to_have_skills", [])
+    }
+
+
+# -------------------------------------------------------------------
+# PERSISTENCE (NEXT TO THE JD FILE)
+# -------------------------------------------------------------------
+
+def _jd_hash(jd_text: str) -> str:
+    return hashlib.sha256(jd_text.encode("utf-8")).hexdigest()
+
+
+def load_jd_profile(jd_dir: Path, jd_text: str):
+    """
+    Returns the stored profile, or None if missing or built from other JD text.
+    """
+    try:
+        with open(Path(jd_dir) / JD_PROFILE_FILE, "r", encoding="utf-8") as f:
+            stored = json.load(f)
+    except (OSError, ValueError):
+        return None
+
+    if stored.get("jd_sha256") != _jd_hash(jd_text):
+        return None
+    return stored.get("profile")
+
+
+def save_jd_profile(jd_dir: Path, jd_text: str, profile: dict):
+    path = Path(jd_dir) / JD_PROFILE_FILE
+    tmp = path.with_suffix(".tmp")
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump({"jd_sha256": _jd_hash(jd_text), "profile": profile}, f, indent=2)
+    os.replace(tmp, path)
+
+
+def ensure_jd_profile(llm, jd_dir: Path, jd_text: str) -> dict:
+    profile = load_jd_profile(jd_dir, jd_text)
+    if profile is None:
+        profile = build_jd_profile(llm, jd_text)
+        save_jd_profile(jd_dir, jd_text, profile)
+    return profile
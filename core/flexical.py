@@ -0,0 +1,74 @@
+# core/flexical.py
+
+import math
+import re
+from collections import Counter
+
+# Keeps tech tokens like c++, c#, node.js and ci/cd intact
+TOKEN_RE = re.compile(r"[a-z0-9][a-z0-9+#./-]*")
+
+STOPWORDS = frozenset(
+    "a an and are as at be by for from has have in is it of on or our "
+    "that the their this to we will with you your".split()
+)
+
+
+def tokenize(text: str) -> list:
+    tokens = []
+    for tok in TOKEN_RE.findall(text.lower()):
+        tok = tok.rstrip("./-")
+        if tok and tok not in STOPWORDS:
+            tokens.append(tok)
+    return tokens
+
+
+def bm25_scores(query: str, documents: list, k1: float = 1.5, b: float = 0.75) -> list:
+    """
+    Okapi BM25 score of every document against the query, rescaled so the
+    best document scores 100. Empty documents score 0.
+    """
+    doc_terms = [Counter(tokenize(doc or "")) for doc in documents]
+    query_terms = set(tokenize(query))
+
+    n_docs = len(documents)
+    if n_docs == 0 or not query_terms:
+        return [0.0] * n_docs
+
+    lengths = [sum(tf.values()) for tf in doc_terms]
+    avg_len = (sum(lengths) / n_docs) or 1.0
+
+    df = Counter()
+    for tf in doc_terms:
+        df.update(query_terms.intersection(tf))
+
+    idf = {
+        term: math.log(1 + (n_docs - df[term] + 0.5) / (df[term] + 0.5))
+        for term in query_terms
+        if df[term]
+    }
+
+    raw = []
+    for tf, length in zip(doc_terms, lengths):
+        norm = k1 * (1 - b + b * length / avg_len)
+        raw.append(sum(
+            weight * tf[term] * (k1 + 1) / (tf[term] + norm)
+            for term, weight in idf.items()
+            if term in tf
+        ))
+
+    best = max(raw)
+    if best <= 0:
+        return [0.0] * n_docs
+    return [round(100 * score / best, 2) for score in raw]
+
+
+def shortlist(scores: list, top_k: int = 0, min_score: float = 0) -> set:
+    """
+    Indices that go on to LLM scoring: the top_k best (0 = no cap)
+    among those scoring at least min_score.
+    """
+    ranked = sorted(range(len(scores)), key=lambda i: scores[i], reverse=True)
+    keep = [i for i in ranked if scores[i] >= min_score]
+    if top_k > 0:
+        keep = keep[:top_k]
+    return set(keep)
@@ -0,0 +1,109 @@
+# core/fmetrics.py
+
+import time
+
+from prometheus_client import CONTENT_TYPE_LATEST, Counter, Histogram, generate_latest
+
+
+# -------------------------------------------------------------------
+# METRICS (PROMETHEUS, PROCESS-WIDE)
+# -------------------------------------------------------------------
+
+# LLM calls run from seconds to minutes on CPU-only Ollama hosts
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 20, 30, 60, 120, 300)
+SIZE_BUCKETS = (256, 512, 1024, 2048, 4096, 8192, 16384, 32768, 65536)
+
+STAGE_SECONDS = Histogram(
+    "resume_pipeline_stage_seconds",
+    "Wall time spent in each analysis pipeline stage",
+    ["stage"],
+    buckets=LATENCY_BUCKETS + (600, 1800)
+)
+
+LLM_SECONDS = Histogram(
+    "resume_llm_request_seconds",
+    "LLM call latency (cache hits included)",
+    ["prompt_type"],
+    buckets=LATENCY_BUCKETS
+)
+
+LLM_REQUESTS = Counter(
+    "resume_llm_requests_total",
+    "LLM calls by prompt type and outcome",
+    ["prompt_type", "outcome"]
+)
+
+LLM_PROMPT_CHARS = Histogram(
+    "resume_llm_prompt_chars",
+    "Prompt size in characters",
+    ["prompt_type"],
+    buckets=SIZE_BUCKETS
+)
+
+LLM_RESPONSE_CHARS = Histogram(
+    "resume_llm_response_chars",
+    "Response size in characters",
+    ["prompt_type"],
+    buckets=SIZE_BUCKETS
+)
+
+LLM_JSON_RESULTS = Counter(
+    "resume_llm_json_results_total",
+    "Structured LLM replies by outcome: ok, repaired (valid after the repair retry) or failed",
+    ["prompt_type", "outcome"]
+)
+
+PAIRWISE_STORE_LOOKUPS = Counter(
+    "resume_pairwise_store_lookups_total",
+    "Pairwise result store lookups by outcome (hit or miss)",
+    ["outcome"]
+)
+
+EXTRACTION_SECONDS = Histogram(
+    "resume_pdf_extraction_seconds",
+    "Time to extract text from one PDF by stop reason (timeouts observed at the limit)",
+    ["outcome"],
+    buckets=(0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120)
+)
+
+EXTRACTION_CACHE_HITS = Counter(
+    "resume_pdf_extraction_cache_hits_total",
+    "PDFs whose text was served from the extraction cache"
+)
+
+DUPLICATE_RESUMES = Counter(
+    "resume_duplicates_total",
+    "Resumes that reused another resume's LLM results, by kind (exact or near)",
+    ["kind"]
+)
+
+
+def render_metrics():
+    """
+    (body, content_type) for the /metrics endpoint.
+    """
+    return generate_latest(), CONTENT_TYPE_LATEST
+
+
+class StageTimer:
+    """
+    Observes STAGE_SECONDS for a sequence of named stages: entering a new
+    stage closes the previous one.
+    """
+
+    def __init__(self):
+        self.stage = None
+        self.started = None
+
+    def enter(self, stage: str):
+        if stage == self.stage:
+            return
+        self.finish()
+        self.stage = stage
+        self.started = time.perf_counter()
+
+    def finish(self):
+        if self.stage is not None:
+            STAGE_SECONDS.labels(stage=self.stage).observe(time.perf_counter() - self.started)
+        self.stage = None
+        self.started = None
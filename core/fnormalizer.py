@@ -0,0 +1,234 @@
+# core/fnormalizer.py
+
+import math
+import re
+from collections import Counter
+
+from core.fconfig import RESUME_TOKEN_BUDGET
+
+# Bump when normalize_resume_text changes what it returns
+NORMALIZER_VERSION = 3
+
+# Running headers/footers are looked for in this many lines at the top and
+# bottom of each page, and only in resumes of at least HEADER_MIN_PAGES pages
+HEADER_ZONE_LINES = 3
+HEADER_MIN_PAGES = 3
+
+# Rough chars-per-token for English resumes on LLaMA tokenizers
+CHARS_PER_TOKEN = 4
+
+# Lower number = kept first when the resume has to be cut to budget
+SECTION_PRIORITY = {
+    "header": 0,
+    "skills": 1,
+    "experience": 2,
+    "summary": 3,
+    "projects": 4,
+    "certifications": 5,
+    "education": 6,
+    "other": 7,
+    "awards": 8,
+    "publications": 9,
+    "languages": 10,
+    "interests": 11,
+    "references": 12
+}
+
+SECTION_HEADINGS = {
+    "skills": ("skills", "technical skills", "core skills", "key skills", "core competencies",
+               "competencies", "technologies", "tech stack", "tools"),
+    "experience": ("experience", "work experience", "professional experience", "employment",
+                   "employment history", "work history", "career history"),
+    "summary": ("summary", "professional summary", "profile", "objective", "career objective",
+                "about me"),
+    "projects": ("projects", "personal projects", "key projects", "academic projects"),
+    "certifications": ("certifications", "certificates", "licenses", "courses", "training"),
+    "education": ("education", "academic background", "qualifications", "academics"),
+    "awards": ("awards", "achievements", "honors", "honours", "accomplishments"),
+    "publications": ("publications", "papers", "research"),
+    "languages": ("languages",),
+    "interests": ("interests", "hobbies", "extracurricular activities", "activities"),
+    "references": ("references", "referees")
+}
+
+_HEADING_LOOKUP = {
+    title: section
+    for section, titles in SECTION_HEADINGS.items()
+    for title in titles
+}
+
+_PAGE_NUMBER_RE = re.compile(r"^(page\s*)?\d+(\s*(of|/)\s*\d+)?$", re.IGNORECASE)
+# Whole contact tokens: e-mail addresses, URLs/profiles and phone numbers
+# (at least 9 digits, so "2018 - 2020" never counts as one)
+_CONTACT_RE = re.compile(
+    r"([\w.+-]*@[\w-]+\.[\w.]+|https?://\S+|www\.\S+|\S*linkedin\.com\S*|\S*github\.com\S*"
+    r"|(?<!\d)\+?\(?\d(?:[\s().-]*\d){8,14}(?!\d))",
+    re.IGNORECASE
+)
+_YEAR_RANGE_RE = re.compile(
+    r"\b(19|20)\d{2}\s*[-\u2013\u2014/]+\s*((19|20)\d{2}|present|current|now)\b",
+    re.IGNORECASE
+)
+_CONTACT_LABELS_RE = re.compile(
+    r"\b(e-?mail|phone|tel|mobile|cell|linkedin|github|portfolio|website|web)\b|[|:,;\u00b7\u2022/()-]",
+    re.IGNORECASE
+)
+_SPACES_RE = re.compile(r"[ \t\u00a0]+")
+
+
+def estimate_tokens(text: str) -> int:
+    return math.ceil(len(text) / CHARS_PER_TOKEN)
+
+
+def _is_contact_line(line: str) -> bool:
+    """
+    True for lines made of contact tokens plus separators/labels only,
+    e.g. "jane@x.com | +1 555 123 4567". A job line that merely contains
+    a URL or a date range is not one.
+    """
+    without_dates = _YEAR_RANGE_RE.sub(" ", line)
+    if not _CONTACT_RE.search(without_dates):
+        return False
+    rest = _CONTACT_LABELS_RE.sub(" ", _CONTACT_RE.sub(" ", without_dates))
+    return not rest.split()
+
+
+def _heading_section(line: str):
+    title = line.strip().strip(":").strip().lower()
+    if len(title.split()) > 4:
+        return None
+    return _HEADING_LOOKUP.get(title)
+
+
+def _edge_lines(lines: list) -> set:
+    """
+    Indexes of the first and last HEADER_ZONE_LINES non-empty lines.
+    """
+    filled = [i for i, line in enumerate(lines) if line]
+    return set(filled[:HEADER_ZONE_LINES] + filled[-HEADER_ZONE_LINES:])
+
+
+def _clean_pages(raw_text: str) -> list:
+    """
+    Whitespace-collapsed lines per page, minus bare page numbers and the
+    repeats of lines printed at the top or bottom of most pages (running
+    headers/footers). Body lines are never dropped, even when the same
+    text appears on several pages (e.g. two jobs with the same title).
+    """
+    pages = []
+    for page in raw_text.split("\f"):
+        lines = [_SPACES_RE.sub(" ", line).strip() for line in page.splitlines()]
+        pages.append([line for line in lines if not _PAGE_NUMBER_RE.match(line)])
+    edges = [_edge_lines(lines) for lines in pages]
+
+    repeated = set()
+    if len(pages) >= HEADER_MIN_PAGES:
+        seen = Counter()
+        for lines, edge in zip(pages, edges):
+            seen.update({lines[i] for i in edge})
+        threshold = max(2, math.ceil(len(pages) / 2))
+        repeated = {line for line, n in seen.items() if n >= threshold}
+
+    # A running header keeps its first occurrence: it is often the
+    # candidate's name and contact line
+    cleaned, printed = [], set()
+    for lines, edge in zip(pages, edges):
+        page = []
+        for i, line in enumerate(lines):
+            if i in edge and line in repeated:
+                if line in printed:
+                    continue
+                printed.add(line)
+            page.append(line)
+        cleaned.append(page)
+    return cleaned
+
+
+def _split_sections(lines: list) -> list:
+    """
+    [(section_name, [lines])] in document order; text before the first
+    heading is the header (name, contact details).
+    """
+    sections = [("header", [])]
+    for line in lines:
+        section = _heading_section(line) if line else None
+        if section:
+            sections.append((section, [line]))
+        else:
+            sections[-1][1].append(line)
+    return [(name, body) for name, body in sections if any(body)]
+
+
+def _join(lines: list) -> str:
+    text = "\n".join(lines)
+    return re.sub(r"\n{3,}", "\n\n", text).strip()
+
+
+def normalize_resume_text(raw_text: str, token_budget: int = RESUME_TOKEN_BUDGET):
+    """
+    Deterministic clean-up of extracted resume text before it is prompted.
+
+    Returns (text, stats). stats reports token counts before/after, the
+    sections found and whether the budget forced sections to be cut;
+    lower-priority sections (see SECTION_PRIORITY) are cut first.
+    """
+    lines = []
+    for page_lines in _clean_pages(raw_text):
+        lines.extend(page_lines)
+        lines.append("")
+
+    # A contact-only line repeating an earlier one (e.g. the contact block
+    # reprinted on a later page) is boilerplate
+    seen_contact = set()
+    kept = []
+    for line in lines:
+        if line and _is_contact_line(line):
+            key = line.lower()
+            if key in seen_contact:
+                continue
+            seen_contact.add(key)
+        kept.append(line)
+
+    sections = _split_sections(kept)
+    text = _join(kept)
+    truncated = False
+
+    if token_budget and estimate_tokens(text) > token_budget:
+        truncated = True
+        budget_chars = token_budget * CHARS_PER_TOKEN
+        allowed = {}
+
+        order = sorted(range(len(sections)), key=lambda i: SECTION_PRIORITY.get(sections[i][0], 7))
+        for i in order:
+            body = _join(sections[i][1])
+            if budget_chars <= 0:
+                break
+            if len(body) <= budget_chars:
+                allowed[i] = sections[i][1]
+                budget_chars -= len(body) + 2
+                continue
+
+            # Partially fits: keep whole lines up to the remaining budget
+            partial, used = [], 0
+            for line in sections[i][1]:
+                if used + len(line) + 1 > budget_chars:
+                    break
+                partial.append(line)
+                used += len(line) + 1
+            if partial:
+                allowed[i] = partial
+            budget_chars = 0
+
+        text = "\n\n".join(_join(allowed[i]) for i in sorted(allowed))
+
+    raw_tokens = estimate_tokens(raw_text)
+    tokens = estimate_tokens(text)
+
+    stats = {
+        "raw_tokens": raw_tokens,
+        "normalized_tokens": tokens,
+        "reduction_pct": round(100 * (raw_tokens - tokens) / raw_tokens, 1) if raw_tokens else 0.0,
+        "sections": [name for name, _ in sections],
+        "truncated": truncated
+    }
+    return text, stats
@@ -1,6 +1,28 @@
 # core/fpairwise_compare.py
 
-from core.futils import force_json
+from core.fstate import content_key
+from core.futils import invoke_json, is_score
+
+PAIRWISE_SCHEMA = {"relative_score": is_score}
+
+# Bump when the prompt changes so stored comparisons are not reused
+PAIRWISE_PROMPT_VERSION = 1
+
+
+def comparison_hashes(base_resume: dict, other_resume: dict):
+    """
+    (baseline_hash, candidate_hash) over exactly the fields the prompt uses.
+    """
+    return (
+        content_key(
+            PAIRWISE_PROMPT_VERSION,
+            base_resume["jd_score"],
+            base_resume["matched_skills"],
+            base_resume["missing_skills"],
+            base_resume["overview"]
+        ),
+        content_key(PAIRWISE_PROMPT_VERSION, other_resume["overview"])
+    )
 
 
 def compare_two_resumes(llm, base_resume: dict, other_resume: dict) -> dict:
@@ -38,13 +60,12 @@ SECOND RESUME:
 Summary: {other_resume["overview"]}
 """
 
-    resp = llm.invoke(prompt)
-    data = force_json(resp)
+    data = invoke_json(llm, prompt, "pairwise", PAIRWISE_SCHEMA)
 
     score = data.get("relative_score", 50)
 
     try:
-        score = int(score)
+        score = int(float(score))
     except Exception:
         score = 50
 
@@ -0,0 +1,102 @@
+# core/fpairwise_store.py
+
+import json
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+from core.fconfig import PAIRWISE_STORE_ENABLED, PAIRWISE_STORE_PATH
+from core.fmetrics import PAIRWISE_STORE_LOOKUPS
+
+
+class PairwiseStore:
+    """
+    Pairwise comparison results keyed by (baseline hash, candidate hash,
+    model id). Every row is loaded into memory when the store is opened,
+    so lookups never touch the disk; new results are written through.
+    """
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS comparisons (
+                baseline_hash TEXT NOT NULL,
+                candidate_hash TEXT NOT NULL,
+                model TEXT NOT NULL,
+                result TEXT NOT NULL,
+                created REAL NOT NULL,
+                PRIMARY KEY (baseline_hash, candidate_hash, model)
+            )
+            """
+        )
+        self._conn.commit()
+
+        self._index = {
+            (baseline, candidate, model): json.loads(result)
+            for baseline, candidate, model, result in self._conn.execute(
+                "SELECT baseline_hash, candidate_hash, model, result FROM comparisons"
+            )
+        }
+
+    def get(self, baseline_hash: str, candidate_hash: str, model: str):
+        result = self._index.get((baseline_hash, candidate_hash, model))
+
+        with self._lock:
+            if result is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        PAIRWISE_STORE_LOOKUPS.labels(outcome="miss" if result is None else "hit").inc()
+        return result
+
+    def put(self, baseline_hash: str, candidate_hash: str, model: str, result: dict):
+        with self._lock:
+            self._conn.execute(
+                """
+                INSERT OR REPLACE INTO comparisons
+                    (baseline_hash, candidate_hash, model, result, created)
+                VALUES (?, ?, ?, ?, ?)
+                """,
+                (baseline_hash, candidate_hash, model, json.dumps(result), time.time())
+            )
+            self._conn.commit()
+            self._index[(baseline_hash, candidate_hash, model)] = result
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._index),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0
+            }
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_pairwise_store():
+    """
+    Process-wide store (None when disabled). Loaded on first use; the API
+    opens it at startup.
+    """
+    global _store
+
+    if not PAIRWISE_STORE_ENABLED:
+        return None
+
+    with _store_lock:
+        if _store is None:
+            _store = PairwiseStore(PAIRWISE_STORE_PATH)
+        return _store
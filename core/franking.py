@@ -0,0 +1,137 @@
+# core/franking.py
+
+import math
+
+# jd_score points worth one logit of Bradley-Terry strength in the prior
+JD_SCORE_SCALE = 15.0
+
+# How far (in logits) comparisons can comfortably move a resume away
+# from where its jd_score puts it
+PRIOR_SIGMA = 2.0
+
+FIT_ITERATIONS = 50
+
+
+def _sigmoid(x: float) -> float:
+    return 1.0 / (1.0 + math.exp(-x))
+
+
+class TournamentRanker:
+    """
+    Budgeted pairwise refinement of a jd_score ranking.
+
+    Every resume gets a Bradley-Terry strength whose prior is its jd_score.
+    Comparisons are soft outcomes: compare_two_resumes(base=i, other=j)
+    returning relative_score s counts as j beating i with weight s / 100.
+
+    Rounds are Swiss-style: the current top `window` resumes (top_k plus a
+    margin) are paired with their nearest not-yet-played neighbour, so the
+    budget goes to the contested top of the list. Resumes outside the
+    window keep their prior strength.
+
+        ranker = TournamentRanker(jd_scores, budget, top_k)
+        while pairs := ranker.next_round():
+            for i, j in pairs:
+                ranker.record(i, j, relative_score_of_j_vs_i)
+        scores = ranker.pairwise_scores()
+    """
+
+    def __init__(self, jd_scores: list, budget: int, top_k: int):
+        n = len(jd_scores)
+        self.budget = max(0, budget)
+        self.spent = 0
+        self.window = min(n, top_k + max(1, top_k // 2))
+
+        self.top = max(jd_scores, default=0)
+        self.prior = [(s - self.top) / JD_SCORE_SCALE for s in jd_scores]
+        self.strength = list(self.prior)
+        # The highest jd_score is the reference: its pairwise score is 50
+        self.anchor = max(range(n), key=lambda i: jd_scores[i], default=None)
+
+        self.games = []  # (i, j, weight of j beating i)
+        self.played = set()
+
+    def ranking(self) -> list:
+        return sorted(
+            range(len(self.strength)),
+            key=lambda i: (self.strength[i], self.prior[i]),
+            reverse=True
+        )
+
+    def next_round(self) -> list:
+        """
+        [(base, other)] pairs for the next round; [] once the budget is
+        spent or every pair in the window has been played.
+        """
+        remaining = self.budget - self.spent
+        if remaining <= 0:
+            return []
+
+        self._fit()
+        order = self.ranking()[:self.window]
+        pairs, paired = [], set()
+
+        for pos, i in enumerate(order):
+            if i in paired:
+                continue
+            for j in order[pos + 1:]:
+                if j not in paired and frozenset((i, j)) not in self.played:
+                    pairs.append((i, j))
+                    paired.update((i, j))
+                    break
+            if len(pairs) >= remaining:
+                break
+
+        return pairs
+
+    def record(self, i: int, j: int, relative_score):
+        """
+        Result of comparing j against base i; None if the call failed
+        (the comparison still counts against the budget).
+        """
+        self.spent += 1
+        self.played.add(frozenset((i, j)))
+        if relative_score is not None:
+            self.games.append((i, j, max(0.0, min(float(relative_score), 100.0)) / 100))
+
+    def _fit(self):
+        # MAP Bradley-Terry with a Gaussian prior, diagonal Newton steps
+        n = len(self.strength)
+        precision = 1.0 / PRIOR_SIGMA ** 2
+
+        for _ in range(FIT_ITERATIONS if self.games else 0):
+            grad = [precision * (p - s) for s, p in zip(self.strength, self.prior)]
+            hess = [precision] * n
+
+            for i, j, won in self.games:
+                p = _sigmoid(self.strength[j] - self.strength[i])
+                grad[j] += won - p
+                grad[i] -= won - p
+                hess[i] += p * (1 - p)
+                hess[j] += p * (1 - p)
+
+            self.strength = [s + g / h for s, g, h in zip(self.strength, grad, hess)]
+
+    def pairwise_scores(self) -> list:
+        """
+        0-100 per resume: modelled chance of beating the anchor resume
+        (50 = on par), the same scale compare_two_resumes uses.
+        """
+        self._fit()
+        if self.anchor is None:
+            return []
+        ref = self.strength[self.anchor]
+        return [int(round(100 * _sigmoid(s - ref))) for s in self.strength]
+
+
+    def ratings(self) -> list:
+        """
+        Fitted strengths back on the jd_score scale (0-100): a resume nobody
+        compared keeps its jd_score. Already combines JD fit and comparisons,
+        so tournament mode ranks on it directly.
+        """
+        self._fit()
+        return [
+            int(round(max(0.0, min(100.0, self.top + JD_SCORE_SCALE * s))))
+            for s in self.strength
+        ]
@@ -0,0 +1,61 @@
+# core/fstate.py
+
+import hashlib
+import json
+import os
+from pathlib import Path
+
+STATE_FILE = "analysis_state.json"
+
+# Bump when the shape of stored records changes
+STATE_VERSION = 1
+
+
+def content_key(*parts) -> str:
+    """
+    Stable hash of JSON-serialisable inputs (JD text, skill lists, records...).
+    """
+    payload = json.dumps(parts, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def _empty_state(jd_key: str) -> dict:
+    return {
+        "version": STATE_VERSION,
+        "jd_key": jd_key,
+        "resumes": {}
+    }
+
+
+def load_state(output_dir: Path, jd_key: str) -> dict:
+    """
+    Per-jd_id intermediate results from earlier runs.
+
+    resumes:  resume sha256 -> record (summary + JD score + skills)
+
+    Pairwise comparisons are kept in the shared pairwise store instead
+    (core/fpairwise_store.py).
+
+    Anything stored for a different JD (or older layout) is discarded.
+    """
+    try:
+        with open(Path(output_dir) / STATE_FILE, "r", encoding="utf-8") as f:
+            state = json.load(f)
+    except (OSError, ValueError):
+        return _empty_state(jd_key)
+
+    if state.get("version") != STATE_VERSION or state.get("jd_key") != jd_key:
+        return _empty_state(jd_key)
+
+    return state
+
+
+def save_state(output_dir: Path, state: dict):
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+
+    path = output_dir / STATE_FILE
+    tmp = path.with_suffix(".tmp")
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(state, f)
+    os.replace(tmp, path)
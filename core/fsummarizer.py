@@ -1,7 +1,16 @@
 #core/fsummarizer.py
 
-from core.futils import force_json
-from langchain_ollama import OllamaLLM
+from typing import TYPE_CHECKING
+
+from core.futils import invoke_json
+
+if TYPE_CHECKING:  # annotation only; langchain is imported when the client is built
+    from langchain_ollama import OllamaLLM
+
+SUMMARY_SCHEMA = {"overview": str, "skills": list}
+
+# Bump when the prompt changes so stored summaries are not reused
+SUMMARY_PROMPT_VERSION = 1
 
 # def summarize_resume(llm: OllamaLLM, raw_text: str) -> dict:
 #     prompt = f"""
@@ -24,7 +33,7 @@ from langchain_ollama import OllamaLLM
 
 
 
-def summarize_resume(llm: OllamaLLM, raw_text: str) -> dict:
+def summarize_resume(llm: "OllamaLLM", raw_text: str) -> dict:
     prompt = f"""
 You are a professional resume analyst.
 
@@ -49,8 +58,7 @@ JSON format:
 Resume:
 {raw_text}
 """
-    resp = llm.invoke(prompt)
-    return force_json(resp)
+    return invoke_json(llm, prompt, "summary", SUMMARY_SCHEMA)
 
 
 
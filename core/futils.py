@@ -1,59 +1,303 @@
 import json
-import re
-import io
 import zipfile
-import matplotlib.pyplot as plt
-import pandas as pd
 
-from langchain_ollama import OllamaLLM
+import threading
+import time
+
+from core.fcache import CachedLLM, get_llm_cache
+from core.fconfig import (
+    LLM_HTTP_MAX_CONNECTIONS,
+    LLM_HTTP_TIMEOUT,
+    LLM_JSON_MODE,
+    LLM_MAX_INFLIGHT,
+    LLM_NUM_PREDICT,
+    OLLAMA_BASE_URL,
+    OLLAMA_KEEP_ALIVE,
+    OLLAMA_MODEL,
+    USE_MOCK_LLM
+)
+from core.fmetrics import (
+    LLM_JSON_RESULTS,
+    LLM_PROMPT_CHARS,
+    LLM_REQUESTS,
+    LLM_RESPONSE_CHARS,
+    LLM_SECONDS
+)
 
 
 # -------------------------------------------------------------------
 # LLM INITIALIZER (OLLAMA SERVER)
 # -------------------------------------------------------------------
 
+class ThrottledLLM:
+    """
+    Caps requests in flight to the backend. One instance is shared by
+    the whole process, so the cap holds across concurrent analyses.
+    """
+
+    def __init__(self, llm, max_inflight: int):
+        self.llm = llm
+        self._slots = threading.BoundedSemaphore(max_inflight)
+
+    def __getattr__(self, name):
+        return getattr(self.llm, name)
+
+    def invoke(self, prompt: str, **kwargs) -> str:
+        with self._slots:
+            return self.llm.invoke(prompt, **kwargs)
+
+
+_llm = None
+_llm_lock = threading.Lock()
+
+
+def _build_ollama_client():
+    # Imported here: langchain is the slowest import in the API, and the
+    # mock backend never needs it
+    import httpx  # installed with the ollama client
+    from langchain_ollama import OllamaLLM
+
+    return OllamaLLM(
+        model=OLLAMA_MODEL,
+        base_url=OLLAMA_BASE_URL,
+        temperature=0.0,
+        top_p=1.0,
+        top_k=1,
+        num_predict=LLM_NUM_PREDICT,
+        keep_alive=OLLAMA_KEEP_ALIVE,
+        format="json" if LLM_JSON_MODE else "",  # constrained decoding, no prose around the object
+        # Passed through to the underlying httpx.Client: one pooled,
+        # keep-alive connection set reused by every request
+        client_kwargs={
+            "timeout": LLM_HTTP_TIMEOUT,
+            "limits": httpx.Limits(
+                max_connections=LLM_HTTP_MAX_CONNECTIONS,
+                max_keepalive_connections=LLM_HTTP_MAX_CONNECTIONS
+            )
+        }
+    )
+
+
 def ensure_llm():
     """
     Connects to remote Ollama server running LLaMA.
+
+    The client is built once per process and shared: calls are capped at
+    LLM_MAX_INFLIGHT and served from the on-disk cache when enabled.
     """
-    try:
-        return OllamaLLM(
-            model="llama3.1:8b",
-            base_url="http://192.168.11.97:11434",
-            temperature=0.0,
-            top_p=1.0,
-            top_k=1,
-            num_predict=512
-        )
-    except Exception as e:
-        raise RuntimeError(f"Ollama server not reachable: {e}")
+    global _llm
+
+    with _llm_lock:
+        if _llm is not None:
+            return _llm
+
+        if USE_MOCK_LLM:
+            from app.mock_llm import MockLLM  # offline testing / benchmarks
+            llm = ThrottledLLM(MockLLM(), LLM_MAX_INFLIGHT)
+        else:
+            try:
+                llm = ThrottledLLM(_build_ollama_client(), LLM_MAX_INFLIGHT)
+            except Exception as e:
+                raise RuntimeError(f"Ollama server not reachable: {e}")
+
+        # Cache outside the throttle: hits never wait for a slot
+        cache = get_llm_cache()
+        _llm = CachedLLM(llm, cache) if cache is not None else llm
+        return _llm
 
 
 # -------------------------------------------------------------------
 # JSON SAFETY
 # -------------------------------------------------------------------
 
+class LLMOutputError(ValueError):
+    """
+    The LLM reply was still unusable after the repair retry.
+    """
+
+
+def _json_objects(txt: str):
+    """
+    Yields every top-level {...} span of txt in one pass. Braces inside
+    JSON strings are ignored, so the cost stays linear in len(txt). A {
+    that is never closed (e.g. in leading prose) does not hide the
+    complete objects after it.
+    """
+    # Open braces as [start, complete spans directly inside it]
+    stack = []
+    in_string = False
+    escaped = False
+
+    for i, ch in enumerate(txt):
+        if in_string:
+            if escaped:
+                escaped = False
+            elif ch == "\\":
+                escaped = True
+            elif ch == '"':
+                in_string = False
+        elif ch == '"':
+            in_string = bool(stack)  # quotes in surrounding prose are not JSON
+        elif ch == "{":
+            stack.append([i, []])
+        elif ch == "}" and stack:
+            start, _ = stack.pop()
+            if stack:
+                stack[-1][1].append((start, i + 1))
+            else:
+                yield txt[start:i + 1]
+
+    # Unclosed braces were prose: their complete children are top-level
+    for _, children in stack:
+        for start, end in children:
+            yield txt[start:end]
+
+
 def force_json(txt: str):
+    """
+    The reply as a dict: the whole text if it is a JSON object, otherwise
+    the first embedded {...} that parses (e.g. inside prose or markdown
+    fences). {} when there is none.
+    """
+    txt = txt or ""
     try:
-        return json.loads(txt)
+        data = json.loads(txt)
+        if isinstance(data, dict):
+            return data
     except Exception:
         pass
 
-    match = re.search(r"\{[\s\S]*\}", txt)
-    if match:
+    for candidate in _json_objects(txt):
         try:
-            return json.loads(match.group(0))
-        except Exception:
-            pass
+            return json.loads(candidate)
+        except ValueError:
+            continue
 
     return {}
 
 
+def is_score(value) -> bool:
+    """
+    0-100, as a number or numeric string (models emit both).
+    """
+    if isinstance(value, bool):
+        return False
+    try:
+        return 0 <= float(value) <= 100
+    except (TypeError, ValueError):
+        return False
+
+
+def schema_problems(data: dict, schema: dict) -> list:
+    """
+    schema maps each required key to a type (or tuple of types) or to a
+    predicate such as is_score. Returns what is wrong, [] when valid.
+    """
+    problems = []
+    for key, check in (schema or {}).items():
+        if key not in data:
+            problems.append(f'missing key "{key}"')
+            continue
+
+        if isinstance(check, (type, tuple)):
+            valid = isinstance(data[key], check)
+        else:
+            valid = check(data[key])
+        if not valid:
+            problems.append(f'invalid value for "{key}": {json.dumps(data[key], default=str)[:80]}')
+    return problems
+
+
+# -------------------------------------------------------------------
+# INSTRUMENTED CALLS
+# -------------------------------------------------------------------
+
+def invoke_llm(llm, prompt: str, prompt_type: str) -> str:
+    """
+    llm.invoke(prompt), recording latency, sizes and outcome under prompt_type.
+    """
+    LLM_PROMPT_CHARS.labels(prompt_type=prompt_type).observe(len(prompt))
+    started = time.perf_counter()
+
+    try:
+        resp = llm.invoke(prompt)
+    except Exception:
+        LLM_REQUESTS.labels(prompt_type=prompt_type, outcome="error").inc()
+        raise
+    finally:
+        LLM_SECONDS.labels(prompt_type=prompt_type).observe(time.perf_counter() - started)
+
+    LLM_REQUESTS.labels(prompt_type=prompt_type, outcome="ok").inc()
+    LLM_RESPONSE_CHARS.labels(prompt_type=prompt_type).observe(len(resp or ""))
+    return resp
+
+
+# Characters of the bad reply quoted back in a repair prompt
+REPAIR_ECHO_CHARS = 2000
+
+
+def _reply_problems(data: dict, schema: dict) -> list:
+    if not data:
+        return ["the reply is not a JSON object"]
+    return schema_problems(data, schema)
+
+
+def _discard_reply(llm, prompt: str):
+    # An unusable reply must not be served from the LLM cache next time
+    evict = getattr(llm, "evict", None)
+    if evict is not None:
+        evict(prompt)
+
+
+def _repair_prompt(prompt: str, resp: str, problems: list) -> str:
+    issues = "\n".join(f"- {p}" for p in problems)
+    return f"""{prompt}
+Your previous reply could not be used:
+{issues}
+
+Previous reply:
+{(resp or "")[:REPAIR_ECHO_CHARS]}
+
+Return ONLY the corrected JSON object. No explanations, no markdown.
+"""
+
+
+def invoke_json(llm, prompt: str, prompt_type: str, schema: dict = None) -> dict:
+    """
+    invoke_llm parsed to a dict and checked against schema (see
+    schema_problems). An unusable reply gets one repair retry that quotes
+    it back with what was wrong; if that fails too, LLMOutputError is
+    raised rather than guessing defaults.
+    """
+    resp = invoke_llm(llm, prompt, prompt_type)
+    data = force_json(resp)
+    problems = _reply_problems(data, schema)
+    if not problems:
+        LLM_JSON_RESULTS.labels(prompt_type=prompt_type, outcome="ok").inc()
+        return data
+    _discard_reply(llm, prompt)
+
+    repair_prompt = _repair_prompt(prompt, resp, problems)
+    resp = invoke_llm(llm, repair_prompt, f"{prompt_type}_repair")
+    data = force_json(resp)
+    problems = _reply_problems(data, schema)
+    if not problems:
+        LLM_JSON_RESULTS.labels(prompt_type=prompt_type, outcome="repaired").inc()
+        return data
+    _discard_reply(llm, repair_prompt)
+
+    LLM_JSON_RESULTS.labels(prompt_type=prompt_type, outcome="failed").inc()
+    raise LLMOutputError(f"unusable {prompt_type} reply from the LLM: {'; '.join(problems)}")
+
+
 # -------------------------------------------------------------------
 # OPTIONAL BACKEND HELPERS
 # -------------------------------------------------------------------
 
 def make_heatmap(pairwise_results, names):
+    # Plotting libraries load on first use only (slow to import, and
+    # unused by the API)
+    import matplotlib.pyplot as plt
     import numpy as np
 
     n = len(names)
@@ -79,9 +323,93 @@ def make_heatmap(pairwise_results, names):
     return fig
 
 
-def create_zip(jd_ranked, pairwise_results, final_ranking, summaries):
-    files = []
+# Bytes buffered before a ZIP chunk is handed to the caller
+ZIP_CHUNK_BYTES = 64 * 1024
+
+
+class _ZipSink:
+    """
+    Write-only, unseekable target for ZipFile: collects output between
+    drains. Without seek() ZipFile streams entries with data descriptors.
+    """
+
+    def __init__(self):
+        self.chunks = []
+        self.pending = 0
+        self.offset = 0
+
+    def write(self, data) -> int:
+        self.chunks.append(bytes(data))
+        self.pending += len(data)
+        self.offset += len(data)
+        return len(data)
 
+    def tell(self) -> int:
+        return self.offset
+
+    def flush(self):
+        pass
+
+    def drain(self) -> bytes:
+        data = b"".join(self.chunks)
+        self.chunks.clear()
+        self.pending = 0
+        return data
+
+
+def iter_json(obj, chunk_chars: int = ZIP_CHUNK_BYTES):
+    """
+    json.dumps(obj, indent=2) as a series of strings of about chunk_chars.
+    """
+    parts, size = [], 0
+    for part in json.JSONEncoder(indent=2).iterencode(obj):
+        parts.append(part)
+        size += len(part)
+        if size >= chunk_chars:
+            yield "".join(parts)
+            parts, size = [], 0
+    if parts:
+        yield "".join(parts)
+
+
+def iter_json_array(items, chunk_chars: int = ZIP_CHUNK_BYTES):
+    """
+    json.dumps(list(items), indent=2) as a series of strings, without
+    building the list: items may be a lazy iterable.
+    """
+    yield "["
+    empty = True
+    for item in items:
+        yield "\n  " if empty else ",\n  "
+        empty = False
+        for chunk in iter_json(item, chunk_chars):
+            yield chunk.replace("\n", "\n  ")
+    yield "]" if empty else "\n]"
+
+
+def iter_zip(entries):
+    """
+    Yields a deflated ZIP archive as byte chunks while it is written.
+    entries yields (filename, chunks), chunks being str/bytes pieces of the
+    file; only about ZIP_CHUNK_BYTES of output is held at a time.
+    """
+    sink = _ZipSink()
+
+    with zipfile.ZipFile(sink, "w", zipfile.ZIP_DEFLATED) as z:
+        for fname, chunks in entries:
+            with z.open(fname, "w") as f:
+                for chunk in chunks:
+                    f.write(chunk.encode("utf-8") if isinstance(chunk, str) else chunk)
+                    if sink.pending >= ZIP_CHUNK_BYTES:
+                        yield sink.drain()
+            if sink.pending >= ZIP_CHUNK_BYTES:
+                yield sink.drain()
+
+    # Remaining entries and the central directory
+    yield sink.drain()
+
+
+def _analysis_zip_entries(jd_ranked, pairwise_results, final_ranking, summaries):
     for r in jd_ranked:
         name = r["resume_name"]
         data = {
@@ -89,20 +417,23 @@ def create_zip(jd_ranked, pairwise_results, final_ranking, summaries):
             "summary": summaries.get(name, {}),
             "jd_result": r
         }
-        files.append((f"{name}_analysis.json", json.dumps(data, indent=2)))
+        yield f"{name}_analysis.json", iter_json(data)
 
-    files.append(("pairwise.json", json.dumps(pairwise_results, indent=2)))
-    files.append(("final_ranking.json", json.dumps(final_ranking, indent=2)))
+    yield "pairwise.json", iter_json_array(pairwise_results)
+    yield "final_ranking.json", iter_json_array(final_ranking)
 
-    mem = io.BytesIO()
-    with zipfile.ZipFile(mem, "w", zipfile.ZIP_DEFLATED) as z:
-        for fname, content in files:
-            z.writestr(fname, content)
 
-    mem.seek(0)
-    return mem.read()
+def iter_analysis_zip(jd_ranked, pairwise_results, final_ranking, summaries):
+    """
+    Streaming create_zip: each JSON file is encoded only as it is written.
+    jd_ranked, pairwise_results and final_ranking may be lazy iterables.
+    """
+    return iter_zip(_analysis_zip_entries(jd_ranked, pairwise_results, final_ranking, summaries))
 
 
+def create_zip(jd_ranked, pairwise_results, final_ranking, summaries):
+    return b"".join(iter_analysis_zip(jd_ranked, pairwise_results, final_ranking, summaries))
+
 
 # #FOR SERVER LLM 
 # import json
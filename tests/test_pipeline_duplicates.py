@@ -0,0 +1,55 @@
+# tests/test_pipeline_duplicates.py
+
+import os
+
+# Configuration is read at import time
+os.environ.setdefault("USE_MOCK_LLM", "1")
+os.environ.setdefault("LLM_CACHE_ENABLED", "0")
+os.environ.setdefault("EXTRACT_CACHE_ENABLED", "0")
+os.environ.setdefault("PAIRWISE_STORE_ENABLED", "0")
+
+import shutil
+
+import fitz
+
+from app.pipeline import _duplicate_roots, run_resume_analysis
+
+RESUME_LINES = [
+    "Jordan Lee",
+    "Senior Backend Engineer with eight years of experience building services.",
+    "Designed and operated payment APIs in Python and Go serving millions of requests.",
+    "Led the migration of a monolith to Kubernetes on AWS with zero downtime.",
+    "Built data pipelines with Kafka, Spark and PostgreSQL for reporting teams.",
+    "Mentored five engineers and ran the on-call rotation for the platform group.",
+    "Introduced contract testing and cut integration failures by half.",
+    "Wrote the internal style guide for REST and gRPC interfaces.",
+    "Education: BSc Computer Science, University of Leeds."
+]
+
+
+def _write_pdf(path, lines):
+    with fitz.open() as doc:
+        page = doc.new_page()
+        page.insert_text((56, 64), "\n".join(lines), fontsize=10)
+        doc.save(path)
+
+
+def test_duplicate_roots_follow_chains():
+    assert _duplicate_roots({1: 0, 2: 1, 4: 3}) == {1: 0, 2: 0, 4: 3}
+
+
+def test_exact_copy_of_near_duplicate(tmp_path):
+    # b is a with one extra line (near-duplicate), c is a byte copy of b
+    # (exact duplicate whose original is itself a duplicate)
+    a, b, c = tmp_path / "a.pdf", tmp_path / "b.pdf", tmp_path / "c.pdf"
+    _write_pdf(a, RESUME_LINES)
+    _write_pdf(b, RESUME_LINES + ["Languages: English, Spanish."])
+    shutil.copy(b, c)
+
+    result = run_resume_analysis([a, b, c], "Python AWS Kubernetes", tmp_path / "out", incremental=False)
+
+    ranked = {r["resume_name"]: r for r in result["ranked_resumes"]}
+    assert "duplicate_of" not in ranked["a.pdf"]
+    assert ranked["b.pdf"]["duplicate_of"] == "a.pdf"
+    assert ranked["c.pdf"]["duplicate_of"] == "a.pdf"
+    assert ranked["c.pdf"]["final_score"] == ranked["a.pdf"]["final_score"]